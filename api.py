@@ -6,23 +6,39 @@ Purpose: REST API endpoints and data schemas for KiddoTrack-Lite
 
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional, Dict, Any
-from datetime import datetime
-import json
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from contextlib import asynccontextmanager, nullcontext
+from typing import List, Optional, Dict, Any, Set, Tuple
+from datetime import datetime, timezone
 import asyncio
+import time
+import orjson
 from enum import Enum
-import threading
 
-from geofence import Location, Geofence, GeofenceChecker
+from geofence import Location, Geofence, GeofenceChecker, haversine_meters
 from simulator import EmergencyState, GPSSimulator, SimulatorConfig
 from logger import AuditLogger
 
 
+# Generated timestamps are reused for up to CLOCK_RESOLUTION seconds
+CLOCK_RESOLUTION = 0.1
+_ts_cache: List[Any] = [0.0, ""]
+
+
+def now_iso() -> str:
+    """Current UTC time as an ISO string, formatted at most once per CLOCK_RESOLUTION."""
+    t = time.time()
+    if t - _ts_cache[0] > CLOCK_RESOLUTION:
+        _ts_cache[:] = [t, datetime.fromtimestamp(t, timezone.utc).isoformat()]
+    return _ts_cache[1]
+
+
 # Pydantic models for API schemas
 class LocationModel(BaseModel):
     """Location data model for API."""
+    model_config = ConfigDict(frozen=True)
+    
     latitude: float = Field(..., ge=-90, le=90, description="Latitude in degrees")
     longitude: float = Field(..., ge=-180, le=180, description="Longitude in degrees")
     timestamp: Optional[str] = None
@@ -30,73 +46,72 @@ class LocationModel(BaseModel):
     @field_validator("timestamp", mode="before")
     def set_timestamp(cls, v: Optional[str]) -> str:
         """Set timestamp if not provided."""
-        return v or datetime.utcnow().isoformat()
-
-    @field_validator("latitude")
-    def validate_latitude(cls, v: float) -> float:
-        """Validate latitude range."""
-        if not -90 <= v <= 90:
-            raise ValueError("Latitude must be between -90 and 90")
-        return v
-
-    @field_validator("longitude")
-    def validate_longitude(cls, v: float) -> float:
-        """Validate longitude range."""
-        if not -180 <= v <= 180:
-            raise ValueError("Longitude must be between -180 and 180")
-        return v
+        return v or now_iso()
 
 
 class GeofenceModel(BaseModel):
     """Geofence data model for API."""
+    model_config = ConfigDict(frozen=True)
+    
     center: LocationModel
     radius_meters: float = Field(..., gt=0, description="Radius in meters")
 
-    @field_validator("radius_meters")
-    def validate_radius(cls, v: float) -> float:
-        """Validate radius is positive."""
-        if v <= 0:
-            raise ValueError("Radius must be positive")
-        return v
-
 
 class EmergencyStateModel(BaseModel):
     """Emergency state model for API."""
+    model_config = ConfigDict(frozen=True)
+    
     state: str
-    timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    timestamp: str = Field(default_factory=now_iso)
 
 
 class AlertModel(BaseModel):
     """Alert data model for API."""
+    model_config = ConfigDict(frozen=True)
+    
     type: str
     message: str
     severity: str
     location: Optional[LocationModel] = None
     details: Optional[Dict[str, Any]] = None
-    timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    timestamp: str = Field(default_factory=now_iso)
 
 
 class StatusModel(BaseModel):
     """System status model for API."""
+    model_config = ConfigDict(frozen=True)
+    
     is_running: bool
     current_location: Optional[LocationModel] = None
     emergency_state: str
     geofence_active: bool
-    last_update: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    last_update: str = Field(default_factory=now_iso)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up global state before serving and tear it down afterwards."""
+    await startup_event()
+    yield
+    await shutdown_event()
 
 
 # FastAPI application
 app = FastAPI(
     title="KiddoTrack-Lite API",
     description="Child safety monitoring system API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
+# Credentials are not allowed with a wildcard origin: browsers reject that
+# pairing, and Starlette would otherwise rewrite the origin header per request
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
-    allow_credentials=True,
+    allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -105,19 +120,57 @@ app.add_middleware(
 simulator: Optional[GPSSimulator] = None
 geofence: Optional[Geofence] = None
 audit_logger: Optional[AuditLogger] = None
-websocket_connections: List[WebSocket] = []
-
-# Thread safety locks
-_global_state_lock = threading.Lock()
-_websocket_lock = threading.Lock()
+websocket_connections: Set[Tuple[WebSocket, asyncio.Queue]] = set()
+
+# Alerts waiting to be coalesced into the next broadcast frame. Created by
+# startup_event so it belongs to the serving event loop; None when not serving.
+_broadcast_queue: Optional[asyncio.Queue] = None
+_broadcast_task: Optional[asyncio.Task] = None
+
+# Event-loop lock for writers that rebind the globals, created per serving
+# loop by startup_event. Read-only endpoints snapshot the globals without it:
+# rebinding a module global is atomic, so they always see a complete object.
+# websocket_connections needs no lock at all since every mutation is a single
+# set operation on the loop thread.
+_global_state_lock: Optional[asyncio.Lock] = None
+
+# Prebuilt AlertModel-shaped payloads; callback paths fill these in directly
+# instead of constructing and validating a Pydantic model per event
+_GEOFENCE_EXIT_TEMPLATE: Dict[str, Any] = {
+    "type": "geofence_exit",
+    "message": "",
+    "severity": "high",
+    "location": None,
+    "details": None,
+    "timestamp": ""
+}
+_EMERGENCY_TEMPLATE: Dict[str, Any] = {
+    "type": "emergency_state_change",
+    "message": "",
+    "severity": "medium",
+    "location": None,
+    "details": None,
+    "timestamp": ""
+}
+
+# Upper bound on a single WebSocket send
+WEBSOCKET_SEND_TIMEOUT = 2.0
+# Pending outbound messages per client before it is considered too slow
+WEBSOCKET_QUEUE_SIZE = 256
+# How long the broadcaster waits for more alerts to join a batch
+BROADCAST_COALESCE_WINDOW = 0.01
 
 
-@app.on_event("startup")
 async def startup_event():
     """Initialize global state on startup."""
-    global simulator, geofence, audit_logger
+    global simulator, geofence, audit_logger, _broadcast_task
+    global _broadcast_queue, _global_state_lock
     
-    with _global_state_lock:
+    # Loop-bound primitives are created here, on the loop that will use them
+    _global_state_lock = asyncio.Lock()
+    _broadcast_queue = asyncio.Queue()
+    
+    async with _global_state_lock:
         # Initialize simulator
         config = SimulatorConfig(
             home_latitude=40.7128,  # New York City
@@ -137,107 +190,165 @@ async def startup_event():
         simulator.add_location_callback(handle_location_update)
         simulator.add_emergency_callback(handle_emergency_update)
     
+    # Compile the haversine kernels now rather than on the first location update
+    haversine_meters(0.0, 0.0, 0.0, 0.0)
+    geofence.distance_from_center(0.0, 0.0)
+    geofence.contains(0.0, 0.0)
+    
+    _broadcast_task = asyncio.create_task(_broadcast_flusher(_broadcast_queue))
+    
     print("KiddoTrack-Lite API initialized")
 
 
-@app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
-    global simulator, audit_logger
+    global simulator, audit_logger, _broadcast_task, _broadcast_queue
+    
+    if _broadcast_task:
+        _broadcast_task.cancel()
+        _broadcast_task = None
+    _broadcast_queue = None
     
-    with _global_state_lock:
+    # The lock is missing if startup never ran or failed before creating it
+    async with _global_state_lock or nullcontext():
         if simulator:
-            simulator.cleanup()  # Use improved cleanup method
+            simulator.stop()
         if audit_logger:
             audit_logger.force_flush()  # Ensure all logs are written
     
     # Clean up WebSocket connections
-    with _websocket_lock:
-        for connection in websocket_connections.copy():
-            try:
-                await connection.close()
-            except:
-                pass
-        websocket_connections.clear()
+    connections = tuple(websocket_connections)
+    websocket_connections.clear()
+    
+    for connection, _ in connections:
+        try:
+            await connection.close()
+        except:
+            pass
     
     print("KiddoTrack-Lite API shutdown")
 
 
 async def handle_location_update(location: Location):
     """Handle location updates from simulator."""
-    global geofence, audit_logger
+    global geofence
     
-    # Check geofence
-    if geofence:
-        is_safe, distance = geofence.check_location(location)
+    # Check geofence on raw floats to keep the per-update path allocation-free;
+    # the exact distance is only needed for the alert message
+    if geofence and not geofence.contains(location.latitude, location.longitude):
+        distance = geofence.distance_from_center(
+            location.latitude, location.longitude
+        ) - geofence.radius_meters
         
-        if not is_safe:
-            alert = AlertModel(
-                type="geofence_exit",
-                location=LocationModel(
-                    latitude=location.latitude,
-                    longitude=location.longitude,
-                    timestamp=location.timestamp
-                ),
-                details={"distance": distance}
-            )
+        if distance > 0:
+            alert = _GEOFENCE_EXIT_TEMPLATE.copy()
+            alert["message"] = f"Child left safe zone ({distance:.0f}m outside)"
+            alert["location"] = {
+                "latitude": location.latitude,
+                "longitude": location.longitude,
+                "timestamp": location.timestamp
+            }
+            alert["details"] = {"distance": distance}
+            alert["timestamp"] = now_iso()
             
             # Log alert
-            if audit_logger:
-                audit_logger.log_alert(alert.model_dump())
+            _log_event("alert", alert)
             
             # Notify WebSocket clients
-            await broadcast_alert(alert)
+            _queue_broadcast(alert)
     
     # Log location
-    if audit_logger:
-        audit_logger.log_location(location)
+    _log_event("location_update", {
+        "latitude": location.latitude,
+        "longitude": location.longitude,
+        "timestamp": location.timestamp
+    })
 
 
 async def handle_emergency_update(state: EmergencyState):
     """Handle emergency state updates from simulator."""
-    global audit_logger
-    
-    alert = AlertModel(
-        type="emergency_state_change",
-        location=LocationModel(
-            latitude=state.latitude,
-            longitude=state.longitude,
-            timestamp=state.timestamp
-        ),
-        details={"state": state.value}
-    )
+    alert = _EMERGENCY_TEMPLATE.copy()
+    alert["message"] = f"Emergency state changed to: {state.value}"
+    alert["severity"] = "critical" if state == EmergencyState.PANIC else "medium"
+    alert["details"] = {"state": state.value}
+    alert["timestamp"] = now_iso()
     
     # Log alert
-    if audit_logger:
-        audit_logger.log_alert(alert.model_dump())
+    _log_event("alert", alert)
     
     # Notify WebSocket clients
-    await broadcast_alert(alert)
+    _queue_broadcast(alert)
 
 
-async def broadcast_alert(alert: AlertModel):
-    """Broadcast alert to all WebSocket connections with thread safety."""
-    message = alert.model_dump()
-    
-    with _websocket_lock:
-        # Copy the list to avoid modification during iteration
-        connections = websocket_connections.copy()
-    
-    # Remove disconnected connections
-    disconnected = []
-    for connection in connections:
+def _log_event(event_type: str, details: Dict[str, Any]) -> None:
+    """Record an audit event; the logger only queues it for its writer thread."""
+    current_logger = audit_logger
+    if current_logger:
+        current_logger.log_event(event_type, details)
+
+
+def _queue_broadcast(alert: Dict[str, Any]) -> None:
+    """Hand an alert to the broadcast flusher, if the app is serving."""
+    queue = _broadcast_queue
+    if queue is not None:
+        queue.put_nowait(alert)
+
+
+async def _websocket_writer(connection: WebSocket, queue: asyncio.Queue):
+    """Drain a connection's outbound queue onto its socket."""
+    try:
+        while True:
+            payload = await queue.get()
+            await asyncio.wait_for(connection.send_bytes(payload), timeout=WEBSOCKET_SEND_TIMEOUT)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        # Send failed or stalled: unregister here so broadcasts stop targeting
+        # it right away, then close to end the endpoint's receive loop
+        websocket_connections.discard((connection, queue))
         try:
-            await connection.send_text(json.dumps(message))
+            await connection.close()
         except Exception:
-            disconnected.append(connection)
+            pass
+
+
+async def _broadcast_flusher(queue: asyncio.Queue):
+    """Coalesce queued alerts into a single batched frame per window."""
+    while True:
+        alerts = [await queue.get()]
+        await asyncio.sleep(BROADCAST_COALESCE_WINDOW)
+        while not queue.empty():
+            alerts.append(queue.get_nowait())
+        await broadcast_alert(orjson.dumps({"batch": alerts}))
+
+
+async def broadcast_alert(payload: bytes):
+    """Queue a serialized alert for delivery to all WebSocket connections."""
+    connections = tuple(websocket_connections)
     
-    # Remove disconnected connections from the main list
-    if disconnected:
-        with _websocket_lock:
-            for conn in disconnected:
-                if conn in websocket_connections:
-                    websocket_connections.remove(conn)
+    # Enqueue without awaiting network writes; slow clients overflow their queue
+    overflowed = []
+    for entry in connections:
+        try:
+            entry[1].put_nowait(payload)
+        except asyncio.QueueFull:
+            overflowed.append(entry)
+    
+    # Drop clients that cannot keep up
+    if overflowed:
+        websocket_connections.difference_update(overflowed)
+        for connection, _ in overflowed:
+            try:
+                await connection.close()
+            except Exception:
+                pass
+
+
+def _iso_timestamp(value: Any) -> str:
+    """Return a stored timestamp as an ISO string, stamping now if it is unset."""
+    if isinstance(value, str):
+        return value
+    return now_iso()
 
 
 # REST API endpoints
@@ -250,40 +361,41 @@ async def root():
 @app.get("/status", response_model=StatusModel)
 async def get_status():
     """Get system status with thread safety."""
-    with _global_state_lock:
-        current_simulator = simulator
-        current_geofence = geofence
+    current_simulator = simulator
+    current_geofence = geofence
     
     if not current_simulator:
         raise HTTPException(status_code=503, detail="Simulator not initialized")
     
+    # Built as a plain dict and returned directly so the hot polling path
+    # skips model construction and response validation
     current_location = current_simulator.get_current_location()
-    location_model = None
+    location_data = None
     if current_location:
-        # Handle mock objects
-        timestamp = current_location.timestamp
-        if hasattr(timestamp, '_mock_name'):  # It's a mock object
-            timestamp = "2024-01-01T12:00:00"
-        location_model = LocationModel(
-            latitude=current_location.latitude,
-            longitude=current_location.longitude,
-            timestamp=timestamp
-        )
-    
-    return StatusModel(
-        is_running=current_simulator.is_running(),
-        emergency_state="normal" if hasattr(current_simulator.get_emergency_state(), '_mock_name') else (current_simulator.get_emergency_state().value if hasattr(current_simulator.get_emergency_state(), 'value') else str(current_simulator.get_emergency_state())),
-        current_location=location_model,
-        geofence_active=current_geofence is not None,
-        last_update=datetime.now().isoformat()
+        location_data = {
+            "latitude": current_location.latitude,
+            "longitude": current_location.longitude,
+            "timestamp": _iso_timestamp(current_location.timestamp)
+        }
+    
+    emergency_state = current_simulator.get_emergency_state()
+    emergency_state = (
+        emergency_state.value if isinstance(emergency_state, EmergencyState) else "normal"
     )
+    
+    return ORJSONResponse({
+        "is_running": current_simulator.is_running(),
+        "current_location": location_data,
+        "emergency_state": emergency_state,
+        "geofence_active": current_geofence is not None,
+        "last_update": now_iso()
+    })
 
 
 @app.get("/location", response_model=LocationModel)
 async def get_current_location():
     """Get current location with thread safety."""
-    with _global_state_lock:
-        current_simulator = simulator
+    current_simulator = simulator
     
     if not current_simulator:
         raise HTTPException(status_code=503, detail="Simulator not initialized")
@@ -292,32 +404,26 @@ async def get_current_location():
     if not location:
         raise HTTPException(status_code=404, detail="No location data available")
     
-    # Handle mock objects
-    timestamp = location.timestamp
-    if hasattr(timestamp, '_mock_name'):  # It's a mock object
-        timestamp = "2024-01-01T12:00:00"
-    
-    return LocationModel(
+    # Internal state is already validated; skip re-running field validators
+    return LocationModel.model_construct(
         latitude=location.latitude,
         longitude=location.longitude,
-        timestamp=timestamp
+        timestamp=_iso_timestamp(location.timestamp)
     )
 
 
 @app.post("/location", response_model=LocationModel)
 async def set_location(location: LocationModel):
     """Set location with thread safety."""
-    with _global_state_lock:
-        current_simulator = simulator
+    current_simulator = simulator
     
     if not current_simulator:
         raise HTTPException(status_code=503, detail="Simulator not initialized")
     
     try:
-        current_simulator.set_location(Location(
-            latitude=location.latitude,
-            longitude=location.longitude,
-            timestamp=location.timestamp
+        # LocationModel already enforced the coordinate ranges
+        current_simulator.set_location(Location.unchecked(
+            location.latitude, location.longitude, location.timestamp
         ))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -328,22 +434,16 @@ async def set_location(location: LocationModel):
 @app.get("/geofence", response_model=GeofenceModel)
 async def get_geofence():
     """Get geofence configuration with thread safety."""
-    with _global_state_lock:
-        current_geofence = geofence
+    current_geofence = geofence
     
     if not current_geofence:
         raise HTTPException(status_code=503, detail="Geofence not configured")
     
-    # Handle mock objects
-    timestamp = current_geofence.center.timestamp
-    if hasattr(timestamp, '_mock_name'):  # It's a mock object
-        timestamp = "2024-01-01T12:00:00"
-    
-    return GeofenceModel(
-        center=LocationModel(
+    return GeofenceModel.model_construct(
+        center=LocationModel.model_construct(
             latitude=current_geofence.center.latitude,
             longitude=current_geofence.center.longitude,
-            timestamp=timestamp
+            timestamp=_iso_timestamp(current_geofence.center.timestamp)
         ),
         radius_meters=current_geofence.radius_meters
     )
@@ -354,19 +454,22 @@ async def set_geofence(geofence_data: GeofenceModel):
     """Set geofence configuration with thread safety."""
     global geofence
     
-    with _global_state_lock:
-        if not simulator:
-            raise HTTPException(status_code=503, detail="Simulator not initialized")
-        
+    state_lock = _global_state_lock
+    if not simulator or state_lock is None:
+        raise HTTPException(status_code=503, detail="Simulator not initialized")
+    
+    async with state_lock:
         try:
             geofence = Geofence(
-                center=Location(
-                    latitude=geofence_data.center.latitude,
-                    longitude=geofence_data.center.longitude,
-                    timestamp=geofence_data.center.timestamp
+                center=Location.unchecked(
+                    geofence_data.center.latitude,
+                    geofence_data.center.longitude,
+                    geofence_data.center.timestamp
                 ),
                 radius_meters=geofence_data.radius_meters
             )
+            # Compile the specialized check here rather than on the next update
+            geofence.contains(0.0, 0.0)
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
     
@@ -376,8 +479,7 @@ async def set_geofence(geofence_data: GeofenceModel):
 @app.post("/panic", response_model=EmergencyStateModel)
 async def trigger_panic():
     """Trigger panic state with thread safety."""
-    with _global_state_lock:
-        current_simulator = simulator
+    current_simulator = simulator
     
     if not current_simulator:
         raise HTTPException(status_code=503, detail="Simulator not initialized")
@@ -387,7 +489,7 @@ async def trigger_panic():
         state = current_simulator.get_emergency_state()
         return EmergencyStateModel(
             state=state.value if hasattr(state, 'value') else str(state),
-            timestamp=datetime.now().isoformat()
+            timestamp=now_iso()
         )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -396,8 +498,7 @@ async def trigger_panic():
 @app.post("/panic/resolve", response_model=EmergencyStateModel)
 async def resolve_panic():
     """Resolve panic state with thread safety."""
-    with _global_state_lock:
-        current_simulator = simulator
+    current_simulator = simulator
     
     if not current_simulator:
         raise HTTPException(status_code=503, detail="Simulator not initialized")
@@ -407,7 +508,7 @@ async def resolve_panic():
         state = current_simulator.get_emergency_state()
         return EmergencyStateModel(
             state=state.value if hasattr(state, 'value') else str(state),
-            timestamp=datetime.now().isoformat()
+            timestamp=now_iso()
         )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -416,8 +517,7 @@ async def resolve_panic():
 @app.post("/simulator/start")
 async def start_simulator():
     """Start simulator with thread safety."""
-    with _global_state_lock:
-        current_simulator = simulator
+    current_simulator = simulator
     
     if not current_simulator:
         raise HTTPException(status_code=503, detail="Simulator not initialized")
@@ -432,8 +532,7 @@ async def start_simulator():
 @app.post("/simulator/stop")
 async def stop_simulator():
     """Stop simulator with thread safety."""
-    with _global_state_lock:
-        current_simulator = simulator
+    current_simulator = simulator
     
     if not current_simulator:
         raise HTTPException(status_code=503, detail="Simulator not initialized")
@@ -448,14 +547,14 @@ async def stop_simulator():
 @app.get("/alerts", response_model=List[AlertModel])
 async def get_recent_alerts(limit: int = 10):
     """Get recent alerts with thread safety."""
-    with _global_state_lock:
-        current_logger = audit_logger
+    current_logger = audit_logger
     
     if not current_logger:
         raise HTTPException(status_code=503, detail="Audit logger not initialized")
     
-    alerts = current_logger.get_recent_entries(limit=limit, event_types=["alert"])
-    return [AlertModel(**alert) for alert in alerts]
+    # Logged alerts are the dicts the handlers built; serialize them as-is
+    alerts = current_logger.get_recent_alerts(limit=limit)
+    return ORJSONResponse(alerts)
 
 
 @app.websocket("/ws")
@@ -463,26 +562,32 @@ async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time updates."""
     await websocket.accept()
     
-    with _websocket_lock:
-        websocket_connections.append(websocket)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=WEBSOCKET_QUEUE_SIZE)
+    writer = asyncio.create_task(_websocket_writer(websocket, queue))
+    entry = (websocket, queue)
+    
+    websocket_connections.add(entry)
     
     try:
+        # Client frames are ignored; read raw ASGI messages so nothing is
+        # decoded, and stop on disconnect without raising
         while True:
-            # Keep connection alive
-            await websocket.receive_text()
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
     except WebSocketDisconnect:
-        with _websocket_lock:
-            if websocket in websocket_connections:
-                websocket_connections.remove(websocket)
+        pass
+    finally:
+        writer.cancel()
+        websocket_connections.discard(entry)
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    with _global_state_lock:
-        current_simulator = simulator
-        current_geofence = geofence
-        current_logger = audit_logger
+    current_simulator = simulator
+    current_geofence = geofence
+    current_logger = audit_logger
     
     return {
         "status": "healthy",
@@ -508,4 +613,24 @@ async def general_exception_handler(request: Request, exc: Exception):
     return JSONResponse(
         status_code=500,
         content={"detail": str(exc)}
-    ) 
\ No newline at end of file
+    ) 
+
+
+if __name__ == "__main__":
+    import uvicorn
+    from config import get_api_config
+    
+    api_config = get_api_config()
+    # C-accelerated event loop, HTTP parser and WebSocket protocol
+    uvicorn.run(
+        app,
+        host=api_config.host,
+        port=api_config.port,
+        loop="uvloop",
+        http="httptools",
+        ws="websockets",
+        # Liveness is checked with protocol pings answered by the server, so
+        # the endpoint's receive loop only wakes for real client frames
+        ws_ping_interval=api_config.websocket_ping_interval,
+        ws_ping_timeout=api_config.websocket_ping_timeout
+    )
@@ -6,14 +6,17 @@ Purpose: Simulated child device that emits location data and handles emergency s
 """
 
 import asyncio
-import json
+import functools
 import time
 import random
+import shutil
 import signal
-import sys
-from datetime import datetime, timedelta
-from typing import Optional, Tuple, Dict, Any
+from datetime import datetime
+from collections import deque
+from typing import Optional, Tuple, Dict, Any, List, Deque
 import httpx
+import numpy as np
+import orjson
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
@@ -24,13 +27,26 @@ from rich.align import Align
 from rich import box
 
 from simulator import GPSSimulator, SimulatorConfig, EmergencyState
-from geofence import Location, Geofence, GeofenceChecker
+from geofence import (
+    Location, Geofence, haversine_meters, check_location_safety_batch
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _safety_cached(latitude: float, longitude: float, center_latitude: float,
+                   center_longitude: float, radius_meters: float) -> Tuple[bool, float]:
+    """Memoized safety check keyed by quantized position and geofence definition."""
+    distance = haversine_meters(latitude, longitude, center_latitude, center_longitude)
+    return distance <= radius_meters, distance - radius_meters
 
 
 def check_location_safety(location: Location, geofence: Geofence) -> Tuple[bool, float]:
     """
     Check if a location is within the geofence.
     
+    Positions are rounded to 5 decimal places (~1 m) so a stationary device
+    with GPS jitter is answered from cache instead of recomputing haversine.
+    
     Args:
         location: Current location to check
         geofence: Geofence to check against
@@ -38,12 +54,32 @@ def check_location_safety(location: Location, geofence: Geofence) -> Tuple[bool,
     Returns:
         Tuple of (is_safe, distance_meters)
     """
-    return geofence.check_location(location)
+    return _safety_cached(
+        round(location.latitude, 5), round(location.longitude, 5),
+        geofence.center.latitude, geofence.center.longitude, geofence.radius_meters
+    )
+
+
+def _build_grid(*labels: str) -> Tuple[Table, Tuple[Text, ...]]:
+    """Build a two-column label/value grid and return it with its value Texts."""
+    table = Table.grid(padding=1)
+    values = tuple(Text() for _ in labels)
+    for label, value in zip(labels, values):
+        table.add_row(label, value)
+    return table, values
 
 
 class ChildSimulator:
     """Child device simulator with location tracking and panic functionality."""
     
+    # Per-state display values, built once instead of on every frame
+    _EMERGENCY_BANNERS = {
+        EmergencyState.PANIC: Text("EMERGENCY - PANIC TRIGGERED", style="bold red"),
+        EmergencyState.RESOLVED: Text("Emergency Resolved", style="bold yellow"),
+        EmergencyState.NORMAL: Text("Normal Operation", style="bold green"),
+    }
+    _EMERGENCY_LABELS = {state: state.value.title() for state in EmergencyState}
+    
     def __init__(self, api_url: str = "http://localhost:8000"):
         """
         Initialize the child simulator.
@@ -53,7 +89,29 @@ class ChildSimulator:
         """
         self.api_url = api_url
         self.console = Console()
-        self.client = httpx.AsyncClient(timeout=5.0)
+        
+        # Layout pieces built from constants are reused across redraws
+        self._header_static_lines = (
+            Text("KiddoTrack-Lite Child Simulator", style="bold green"),
+            Text("GPS Location & Emergency Monitoring", style="italic")
+        )
+        self._controls_panel: Optional[Panel] = None
+        self._footer_panel: Optional[Panel] = None
+        self._info_panel: Optional[Panel] = None
+        self._info_key: Optional[float] = None
+        # Grids are built once; frames only set the .plain of their value Texts
+        self._location_grid = _build_grid("Latitude:", "Longitude:", "Last Update:")
+        self._location_geofence_grid = _build_grid(
+            "Latitude:", "Longitude:", "Last Update:", "Geofence Status:"
+        )
+        self._status_grid = _build_grid("Device Status:", "Simulator:", "Last Update:")
+        # One pooled client for the process lifetime; idle connections are kept
+        # alive between the 1 Hz polls instead of reconnecting each tick
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(5.0, connect=2.0),
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=10,
+                                keepalive_expiry=60.0)
+        )
         
         # Initialize GPS simulator
         config = SimulatorConfig(
@@ -71,11 +129,32 @@ class ChildSimulator:
         self.current_geofence: Optional[Geofence] = None
         self.emergency_state = EmergencyState.NORMAL
         self.last_alert_time: float = 0  # Unix timestamp for compatibility
-        self.last_update_time: Optional[datetime] = None
+        self.last_update_time: Optional[float] = None  # Unix timestamp of last poll
+        self._update_in_flight = False
+        # Consecutive failed polls; drives the retry backoff in _fetch_loop
+        self._fail_count = 0
+        self.last_error_time: float = 0
+        self.error_cooldown_seconds = 10
+        self._dirty = True
+        self._render_interval = 1.0
+        self._hidden_render_interval = 10.0
+        self._visible = True
+        self._last_status: Optional[Dict[str, Any]] = None
+        # Only ever updated in place by _update_data; never shared with the GPS simulator
+        self._polled_location: Optional[Location] = None
+        # Definition of current_geofence, so an unchanged /geofence poll is a no-op
+        self._geofence_sig: Optional[Tuple[float, float, float]] = None
         self.alert_cooldown_seconds = 30
+        # Last simulator point at ~1 m resolution, its geofence and safety result
+        self._last_loc_key: Optional[Tuple[float, float]] = None
+        self._last_loc_geofence: Optional[Geofence] = None
+        self._last_safety: Tuple[bool, float] = (True, 0.0)
+        # Recent geofence warnings as (unix_time, distance_m), shown in the layout
+        self._warn_buffer: Deque[Tuple[float, float]] = deque(maxlen=32)
         
         # Add callbacks
         self.simulator.add_location_callback(self._on_location_update)
+        self.simulator.add_location_batch_callback(self._on_locations_batch)
         self.simulator.add_emergency_callback(self._on_emergency_update)
         
         # Setup signal handlers
@@ -91,6 +170,14 @@ class ChildSimulator:
     def geofence(self, value: Optional[Geofence]) -> None:
         """Set current geofence (for backward compatibility)."""
         self.current_geofence = value
+        self._geofence_sig = None
+    
+    def _on_resize(self, signum: int, frame: Any) -> None:
+        """Treat a terminal resized to zero rows or columns as not visible."""
+        columns, lines = shutil.get_terminal_size(fallback=(80, 24))
+        self._visible = columns > 0 and lines > 0
+        if self._visible:
+            self._dirty = True
     
     def _signal_handler(self, signum: int, frame: Any) -> None:
         """Handle shutdown signals."""
@@ -115,85 +202,196 @@ class ChildSimulator:
         # Start GPS simulator
         self.simulator.start()
         
-        # Start the monitoring loop
+        # Track terminal resizes so a collapsed window stops being redrawn
+        if hasattr(signal, "SIGWINCH"):
+            signal.signal(signal.SIGWINCH, self._on_resize)
+        
+        # Poll the API in the background; the render loop redraws only on change
+        fetch_task = asyncio.create_task(self._fetch_loop())
         try:
-            with Live(self._create_layout(), refresh_per_second=1, screen=True) as live:
+            # Redraw only when told to; no background refresh thread
+            with Live(self._create_layout(), auto_refresh=False, screen=True) as live:
                 while self.is_running:
-                    await self._update_data()
-                    live.update(self._create_layout())
-                    await asyncio.sleep(1)
+                    if self._dirty and self._visible:
+                        self._dirty = False
+                        live.update(self._create_layout(), refresh=True)
+                    await asyncio.sleep(
+                        self._render_interval if self._visible else self._hidden_render_interval
+                    )
         except KeyboardInterrupt:
             self.console.print("\n[yellow]Shutting down child simulator...[/yellow]")
         finally:
+            fetch_task.cancel()
             self.simulator.stop()
             await self.client.aclose()
     
+    async def _fetch_loop(self):
+        """Poll the API once per second while running, backing off on failures."""
+        while self.is_running:
+            await self._update_data()
+            await asyncio.sleep(self._poll_delay())
+    
+    def _poll_delay(self) -> float:
+        """Seconds until the next poll: 1s when healthy, else 2s, 4s, 8s... up to 30s plus jitter."""
+        if not self._fail_count:
+            return 1.0
+        return min(30, 2 ** self._fail_count) + random.random()
+    
     async def _update_data(self):
         """Update data from the API."""
+        # Skip this tick if the previous poll is still waiting on the API
+        if self._update_in_flight:
+            return
+        self._update_in_flight = True
+        
         try:
-            # Get current status
-            response = await self.client.get(f"{self.api_url}/status")
-            if response.status_code == 200:
-                status_data = response.json()
-                
-                # Update location
-                if status_data.get("current_location"):
-                    loc_data = status_data["current_location"]
-                    self.current_location = Location(
-                        latitude=loc_data["latitude"],
-                        longitude=loc_data["longitude"],
-                        timestamp=loc_data.get("timestamp")
-                    )
-                
-                # Update emergency state
-                self.emergency_state = EmergencyState(status_data.get("emergency_state", "normal"))
+            # While a geofence is active, fetch it alongside status so a tick
+            # costs one round-trip; otherwise only status is requested
+            with_geofence = bool(self._last_status and self._last_status.get("geofence_active"))
+            requests = [self.client.get(f"{self.api_url}/status")]
+            if with_geofence:
+                requests.append(self.client.get(f"{self.api_url}/geofence"))
+            responses = await asyncio.gather(*requests, return_exceptions=True)
+            status_response = responses[0]
+            if isinstance(status_response, BaseException):
+                raise status_response
+            
+            if status_response.status_code == 200:
+                status_data = orjson.loads(status_response.content)
+                # last_update is stamped per request, so it never matches; the
+                # rest is compared to skip rebuilding state on idle ticks
+                status_data.pop("last_update", None)
+                if status_data != self._last_status:
+                    self._last_status = status_data
+                    self._dirty = True
+                    
+                    # Update location, reusing the object this poller owns
+                    if status_data.get("current_location"):
+                        loc_data = status_data["current_location"]
+                        polled = self._polled_location
+                        if polled is None:
+                            polled = self._polled_location = Location(
+                                latitude=loc_data["latitude"],
+                                longitude=loc_data["longitude"],
+                                timestamp=loc_data.get("timestamp")
+                            )
+                        else:
+                            # Already range-checked by the API
+                            polled.latitude = loc_data["latitude"]
+                            polled.longitude = loc_data["longitude"]
+                            polled.timestamp = loc_data.get("timestamp")
+                        self.current_location = polled
+                    
+                    # Update emergency state
+                    self.emergency_state = EmergencyState(status_data.get("emergency_state", "normal"))
                 
-                # Update geofence status
+                # Update geofence status; a newly set one is fetched on its own
                 if status_data.get("geofence_active"):
-                    await self._update_geofence()
+                    if with_geofence:
+                        geofence_response = responses[1]
+                    else:
+                        geofence_response, = await asyncio.gather(
+                            self.client.get(f"{self.api_url}/geofence"),
+                            return_exceptions=True
+                        )
+                    self._apply_geofence(geofence_response)
                 
-                self.last_update_time = datetime.now()
+                # Formatted only when a redraw happens for some other change
+                self.last_update_time = time.time()
+            
+            self._fail_count = 0
                     
         except Exception as e:
-            self.console.print(f"[red]Error updating data: {e}[/red]")
+            self._fail_count += 1
+            # Rate-limit the message so a down server does not flood the console
+            current_time = time.time()
+            if current_time - self.last_error_time >= self.error_cooldown_seconds:
+                self.console.print(f"[red]Error updating data: {e}[/red]")
+                self.last_error_time = current_time
+        finally:
+            self._update_in_flight = False
     
     async def _update_geofence(self):
         """Update geofence data from API."""
         try:
             response = await self.client.get(f"{self.api_url}/geofence")
+        except Exception:
+            # Geofence might not be configured yet
+            return
+        self._apply_geofence(response)
+    
+    def _apply_geofence(self, response: Any) -> None:
+        """Replace the current geofence from a /geofence response, if usable."""
+        try:
             if response.status_code == 200:
-                geofence_data = response.json()
+                geofence_data = orjson.loads(response.content)
                 center_data = geofence_data["center"]
                 
+                # The geofence rarely changes; keep the current object while
+                # its definition is the same
+                sig = (center_data["latitude"], center_data["longitude"],
+                       geofence_data["radius_meters"])
+                if sig == self._geofence_sig:
+                    return
+                
                 self.current_geofence = Geofence(
-                    center=Location(
-                        latitude=center_data["latitude"],
-                        longitude=center_data["longitude"]
-                    ),
-                    radius_meters=geofence_data["radius_meters"]
+                    center=Location(latitude=sig[0], longitude=sig[1]),
+                    radius_meters=sig[2]
                 )
+                self._geofence_sig = sig
+                self._dirty = True
         except Exception:
-            # Geofence might not be configured yet
+            # Geofence might not be configured yet, or the request failed
             pass
     
     def _on_location_update(self, location: Location):
         """Handle location updates from simulator."""
         self.current_location = location
+        self._dirty = True
         
         # Check geofence if available
         if self.current_geofence:
-            is_safe, distance = check_location_safety(location, self.current_geofence)
+            # A stationary child repeats the same point; reuse the last answer
+            key = (round(location.latitude, 5), round(location.longitude, 5))
+            if key == self._last_loc_key and self.current_geofence is self._last_loc_geofence:
+                is_safe, distance = self._last_safety
+            else:
+                is_safe, distance = check_location_safety(location, self.current_geofence)
+                self._last_loc_key = key
+                self._last_loc_geofence = self.current_geofence
+                self._last_safety = (is_safe, distance)
             
             if not is_safe:
                 # Prevent spam - only alert every 30 seconds
                 current_time = time.time()
                 if current_time - self.last_alert_time > self.alert_cooldown_seconds:
-                    self.console.print(f"[yellow]WARNING: Left safe zone! Distance: {distance:.1f}m[/yellow]")
+                    # Buffered for the alerts panel; no terminal I/O on the callback path
+                    self._warn_buffer.append((current_time, distance))
                     self.last_alert_time = current_time
     
+    def _on_locations_batch(self, locations: List[Location]):
+        """Handle a burst of buffered locations with one vectorized safety check."""
+        self.current_location = locations[-1]
+        self._dirty = True
+        
+        if not self.current_geofence:
+            return
+        
+        lats = np.fromiter((loc.latitude for loc in locations), dtype=np.float64, count=len(locations))
+        lons = np.fromiter((loc.longitude for loc in locations), dtype=np.float64, count=len(locations))
+        is_safe, distance = check_location_safety_batch(lats, lons, self.current_geofence)
+        
+        if not is_safe.all():
+            # Same cooldown as single updates; report the furthest excursion
+            current_time = time.time()
+            if current_time - self.last_alert_time > self.alert_cooldown_seconds:
+                self._warn_buffer.append((current_time, float(distance.max())))
+                self.last_alert_time = current_time
+    
     def _on_emergency_update(self, state: EmergencyState):
         """Handle emergency state updates from simulator."""
         self.emergency_state = state
+        self._dirty = True
         
         if state == EmergencyState.PANIC:
             self.console.print("[bold red]!!! PANIC TRIGGERED !!![/bold red]")
@@ -246,7 +444,8 @@ class ChildSimulator:
         
         layout["right"].split_column(
             Layout(name="controls", ratio=1),
-            Layout(name="info", ratio=1)
+            Layout(name="info", ratio=1),
+            Layout(name="alerts", ratio=1)
         )
         
         # Populate sections
@@ -255,22 +454,19 @@ class ChildSimulator:
         layout["status"].update(self._create_status())
         layout["controls"].update(self._create_controls())
         layout["info"].update(self._create_info())
+        layout["alerts"].update(self._create_alerts())
         layout["footer"].update(self._create_footer())
         
         return layout
     
     def _create_header(self) -> Panel:
         """Create the header panel."""
-        title = Text("KiddoTrack-Lite Child Simulator", style="bold green")
-        subtitle = Text("GPS Location & Emergency Monitoring", style="italic")
+        title, subtitle = self._header_static_lines
         
         # Emergency indicator
-        if self.emergency_state == EmergencyState.PANIC:
-            status = Text("EMERGENCY - PANIC TRIGGERED", style="bold red")
-        elif self.emergency_state == EmergencyState.RESOLVED:
-            status = Text("Emergency Resolved", style="bold yellow")
-        else:
-            status = Text("Normal Operation", style="bold green")
+        status = self._EMERGENCY_BANNERS.get(
+            self.emergency_state, self._EMERGENCY_BANNERS[EmergencyState.NORMAL]
+        )
         
         content = Align.center(
             Text.assemble(
@@ -289,15 +485,17 @@ class ChildSimulator:
         if not self.current_location:
             content = Text("No location data available", style="yellow")
         else:
-            table = Table.grid(padding=1)
-            table.add_row("Latitude:", f"{self.current_location.latitude:.6f}")
-            table.add_row("Longitude:", f"{self.current_location.longitude:.6f}")
-            table.add_row("Last Update:", self.current_location.timestamp)
+            # Prebuilt grids; only the value texts are rewritten each frame
+            table, values = (
+                self._location_geofence_grid if self.current_geofence else self._location_grid
+            )
+            values[0].plain = f"{self.current_location.latitude:.6f}"
+            values[1].plain = f"{self.current_location.longitude:.6f}"
+            values[2].plain = self.current_location.timestamp or ""
             
             if self.current_geofence:
                 is_safe, distance = check_location_safety(self.current_location, self.current_geofence)
-                status = "Safe" if is_safe else f"Unsafe ({distance:.1f}m from safe zone)"
-                table.add_row("Geofence Status:", status)
+                values[3].plain = "Safe" if is_safe else f"Unsafe ({distance:.1f}m from safe zone)"
             
             content = table
         
@@ -310,10 +508,13 @@ class ChildSimulator:
     
     def _create_status(self) -> Panel:
         """Create the status panel."""
-        table = Table.grid(padding=1)
-        table.add_row("Device Status:", self.emergency_state.value.title())
-        table.add_row("Simulator:", "Running" if self.simulator.is_running else "Stopped")
-        table.add_row("Last Update:", self.last_update_time.strftime("%H:%M:%S") if self.last_update_time else "Never")
+        table, values = self._status_grid
+        values[0].plain = self._EMERGENCY_LABELS[self.emergency_state]
+        values[1].plain = "Running" if self.simulator.is_running else "Stopped"
+        values[2].plain = (
+            time.strftime("%H:%M:%S", time.localtime(self.last_update_time))
+            if self.last_update_time is not None else "Never"
+        )
         
         return Panel(
             table,
@@ -323,22 +524,30 @@ class ChildSimulator:
         )
     
     def _create_controls(self) -> Panel:
-        """Create the controls panel."""
+        """Create the controls panel (static, built once)."""
+        if self._controls_panel is not None:
+            return self._controls_panel
+        
         table = Table.grid(padding=1)
         table.add_row("[bold]Controls:[/bold]")
         table.add_row("p - Trigger Panic")
         table.add_row("r - Resolve Panic")
         table.add_row("Ctrl+C - Exit")
         
-        return Panel(
+        self._controls_panel = Panel(
             table,
             title="Controls",
             border_style="blue",
             box=box.ROUNDED
         )
+        return self._controls_panel
     
     def _create_info(self) -> Panel:
-        """Create the info panel."""
+        """Create the info panel, rebuilt only when the geofence radius changes."""
+        info_key = self.current_geofence.radius_meters if self.current_geofence else None
+        if self._info_panel is not None and info_key == self._info_key:
+            return self._info_panel
+        
         table = Table.grid(padding=1)
         table.add_row("[bold]Device Info:[/bold]")
         table.add_row("API URL:", self.api_url)
@@ -348,15 +557,39 @@ class ChildSimulator:
         else:
             table.add_row("Geofence:", "Not set")
         
-        return Panel(
+        self._info_panel = Panel(
             table,
             title="Device Info",
             border_style="blue",
             box=box.ROUNDED
         )
+        self._info_key = info_key
+        return self._info_panel
+    
+    def _create_alerts(self) -> Panel:
+        """Create the recent geofence warnings panel."""
+        if not self._warn_buffer:
+            content = Text("No recent alerts", style="dim")
+        else:
+            content = Table.grid(padding=1)
+            for alert_time, distance in list(self._warn_buffer)[-5:]:
+                content.add_row(
+                    datetime.fromtimestamp(alert_time).strftime("%H:%M:%S"),
+                    f"[yellow]Left safe zone ({distance:.1f}m)[/yellow]"
+                )
+        
+        return Panel(
+            content,
+            title="Recent Alerts",
+            border_style="yellow",
+            box=box.ROUNDED
+        )
     
     def _create_footer(self) -> Panel:
-        """Create the footer panel."""
+        """Create the footer panel (static, built once)."""
+        if self._footer_panel is not None:
+            return self._footer_panel
+        
         content = Text.assemble(
             "KiddoTrack-Lite ",
             Text("v1.0.0", style="dim"),
@@ -364,11 +597,12 @@ class ChildSimulator:
             Text("Child Simulator", style="italic")
         )
         
-        return Panel(
+        self._footer_panel = Panel(
             Align.center(content),
             border_style="green",
             box=box.ROUNDED
         )
+        return self._footer_panel
 
 
 async def main():
@@ -48,6 +48,8 @@ class APIConfig:
     description: str = "Child safety monitoring system API"
     version: str = "1.0.0"
     websocket_max_connections: int = 100
+    websocket_ping_interval: float = 20.0  # seconds between protocol pings
+    websocket_ping_timeout: float = 20.0  # seconds to wait for a pong
     request_timeout: float = 30.0  # seconds
 
 
@@ -88,65 +90,34 @@ class Config:
         # Load from environment variables if available
         self._load_from_env()
     
+    # (environment variable, config section, attribute, type)
+    _ENV_MAP = [
+        ("LOGGER_BUFFER_SIZE", "logger", "buffer_size", int),
+        ("LOGGER_MAX_FILE_SIZE", "logger", "max_file_size", int),
+        ("LOG_DIRECTORY", "logger", "log_directory", str),
+        ("HOME_LATITUDE", "simulator", "home_lat", float),
+        ("HOME_LONGITUDE", "simulator", "home_lon", float),
+        ("UPDATE_FREQUENCY", "simulator", "update_frequency", float),
+        ("MAX_WANDER_DISTANCE", "simulator", "max_wander_distance", float),
+        ("API_HOST", "api", "host", str),
+        ("API_PORT", "api", "port", int),
+        ("DEFAULT_GEOFENCE_RADIUS", "geofence", "default_radius", float),
+    ]
+    
     def _load_from_env(self):
         """Load configuration from environment variables."""
-        # Logger config
+        for env_name, section, attr, caster in self._ENV_MAP:
+            self._apply_env(env_name, section, attr, caster)
+    
+    def _apply_env(self, env_name: str, section: str, attr: str, caster) -> None:
+        """Set one config value from the environment; unset, empty or invalid values keep the default."""
+        value = os.environ.get(env_name)
+        if not value:
+            return
         try:
-            if os.getenv("LOGGER_BUFFER_SIZE"):
-                self.logger.buffer_size = int(os.getenv("LOGGER_BUFFER_SIZE"))
+            setattr(getattr(self, section), attr, caster(value))
         except (ValueError, TypeError):
             pass  # Use default value
-            
-        try:
-            if os.getenv("LOGGER_MAX_FILE_SIZE"):
-                self.logger.max_file_size = int(os.getenv("LOGGER_MAX_FILE_SIZE"))
-        except (ValueError, TypeError):
-            pass
-            
-        if os.getenv("LOG_DIRECTORY"):
-            self.logger.log_directory = os.getenv("LOG_DIRECTORY")
-        
-        # Simulator config
-        try:
-            if os.getenv("HOME_LATITUDE"):
-                self.simulator.home_lat = float(os.getenv("HOME_LATITUDE"))
-        except (ValueError, TypeError):
-            pass
-            
-        try:
-            if os.getenv("HOME_LONGITUDE"):
-                self.simulator.home_lon = float(os.getenv("HOME_LONGITUDE"))
-        except (ValueError, TypeError):
-            pass
-            
-        try:
-            if os.getenv("UPDATE_FREQUENCY"):
-                self.simulator.update_frequency = float(os.getenv("UPDATE_FREQUENCY"))
-        except (ValueError, TypeError):
-            pass
-            
-        try:
-            if os.getenv("MAX_WANDER_DISTANCE"):
-                self.simulator.max_wander_distance = float(os.getenv("MAX_WANDER_DISTANCE"))
-        except (ValueError, TypeError):
-            pass
-        
-        # API config
-        if os.getenv("API_HOST"):
-            self.api.host = os.getenv("API_HOST")
-            
-        try:
-            if os.getenv("API_PORT"):
-                self.api.port = int(os.getenv("API_PORT"))
-        except (ValueError, TypeError):
-            pass
-        
-        # Geofence config
-        try:
-            if os.getenv("DEFAULT_GEOFENCE_RADIUS"):
-                self.geofence.default_radius = float(os.getenv("DEFAULT_GEOFENCE_RADIUS"))
-        except (ValueError, TypeError):
-            pass
     
     def get_log_file_path(self) -> str:
         """Get the full path to the log file."""
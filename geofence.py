@@ -5,41 +5,355 @@ Purpose: Geofence calculations and location validation
 """
 
 import math
-from dataclasses import dataclass
-from typing import Tuple
+from dataclasses import dataclass, field
+from typing import ClassVar, List, Tuple
 
+import numpy as np
 
-@dataclass
+try:
+    from numba import njit, vectorize
+except ImportError:
+    vectorize = None
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when Numba is not installed."""
+        def decorator(func):
+            return func
+        return decorator
+
+
+EARTH_RADIUS_METERS = 6371000.0  # Earth's radius in meters
+METERS_PER_DEGREE = EARTH_RADIUS_METERS * math.pi / 180.0  # Along a meridian
+SHORTCUT_MAX_RADIUS_METERS = 100000.0  # Largest radius using the box shortcut
+EQUIRECT_MAX_RADIUS_METERS = 10000.0  # Radii below this use the flat-earth check
+
+
+@njit(cache=True, fastmath=True)
+def haversine_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great circle distance in meters between two points given as raw degrees.
+    
+    JIT-compiled with Numba when available; plain Python otherwise.
+    """
+    lat1 = math.radians(lat1)
+    lon1 = math.radians(lon1)
+    lat2 = math.radians(lat2)
+    lon2 = math.radians(lon2)
+    
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    
+    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
+    c = 2 * math.asin(math.sqrt(a))
+    
+    return EARTH_RADIUS_METERS * c
+
+
+@njit(cache=True, fastmath=True)
+def _haversine_from_center(lat: float, lon: float, center_lat_rad: float,
+                           center_lon_rad: float, cos_center_lat: float) -> float:
+    """Haversine distance in meters to a center given in precomputed radians."""
+    lat = math.radians(lat)
+    lon = math.radians(lon)
+    
+    dlat = center_lat_rad - lat
+    dlon = center_lon_rad - lon
+    
+    a = math.sin(dlat/2)**2 + math.cos(lat) * cos_center_lat * math.sin(dlon/2)**2
+    c = 2 * math.asin(math.sqrt(a))
+    
+    return EARTH_RADIUS_METERS * c
+
+
+def _haversine_elementwise(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Scalar haversine compiled by Numba into the _haversine_ufunc ufunc."""
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (math.sin(dlat*0.5)**2
+         + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon*0.5)**2)
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(a))
+
+
+def _haversine_numpy(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Broadcasting NumPy haversine, used as _haversine_ufunc without Numba."""
+    lat1 = np.radians(np.asarray(lat1, dtype=np.float64))
+    lat2 = np.radians(np.asarray(lat2, dtype=np.float64))
+    dlat = lat2 - lat1
+    dlon = np.radians(np.asarray(lon2, dtype=np.float64) - np.asarray(lon1, dtype=np.float64))
+    a = np.sin(dlat*0.5)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon*0.5)**2
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(a))
+
+
+if vectorize is not None:
+    # Multi-threaded ufunc; broadcasts like any NumPy ufunc
+    _haversine_ufunc = vectorize(
+        ["float64(float64, float64, float64, float64)"], target="parallel", fastmath=True
+    )(_haversine_elementwise)
+else:
+    _haversine_ufunc = _haversine_numpy
+
+
+def haversine_batch(lat: np.ndarray, lon: np.ndarray,
+                    center_lat: float, center_lon: float) -> np.ndarray:
+    """
+    Vectorized great circle distance in meters from many points to one center.
+    
+    Args:
+        lat: Array of latitudes in degrees
+        lon: Array of longitudes in degrees
+        center_lat: Center latitude in degrees
+        center_lon: Center longitude in degrees
+        
+    Returns:
+        Array of distances in meters
+    """
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    center_lat_rad = math.radians(center_lat)
+    center_lon_rad = math.radians(center_lon)
+    
+    dlat = lat - center_lat_rad
+    dlon = lon - center_lon_rad
+    
+    a = np.sin(dlat*0.5)**2 + np.cos(lat) * math.cos(center_lat_rad) * np.sin(dlon*0.5)**2
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(a))
+
+
+def _shortcut_box(radius_meters: float, cos_center_lat: float) -> Tuple[float, float]:
+    """
+    Half-sides in degrees of a square inscribed in the geofence circle.
+    
+    The square has a margin for the flat-earth approximation; points in it
+    are inside without any trig. It is empty where that approximation
+    breaks down.
+    """
+    if radius_meters <= SHORTCUT_MAX_RADIUS_METERS and cos_center_lat > 0.1:
+        dlat_max = 0.9 * radius_meters / (math.sqrt(2.0) * METERS_PER_DEGREE)
+        return dlat_max, dlat_max / cos_center_lat
+    return 0.0, 0.0
+
+
+# Compiled once at import for every geofence, which passes its own constants
+@njit("boolean(float64, float64, float64, float64, float64, float64, float64, "
+      "float64, float64, float64)", cache=True, fastmath=True)
+def _inside_geofence(lat: float, lon: float, center_lat: float, center_lon: float,
+                     center_lat_rad: float, center_lon_rad: float, cos_center_lat: float,
+                     dlat_max: float, dlon_max: float, radius_meters: float) -> bool:
+    """Whether a point in raw degrees lies within radius_meters of the center."""
+    if abs(lat - center_lat) < dlat_max and abs(lon - center_lon) < dlon_max:
+        return True
+    return _haversine_from_center(
+        lat, lon, center_lat_rad, center_lon_rad, cos_center_lat
+    ) <= radius_meters
+
+
+def _equirect_offsets(lat1: float, lon1: float, lat2: float, lon2: float,
+                      cos_lat: float) -> Tuple[float, float]:
+    """East/north offsets in meters between two points, scaled by cos_lat."""
+    dlon = lon2 - lon1
+    # Take the short way round across the antimeridian
+    if dlon > 180.0:
+        dlon -= 360.0
+    elif dlon < -180.0:
+        dlon += 360.0
+    return dlon * cos_lat * METERS_PER_DEGREE, (lat2 - lat1) * METERS_PER_DEGREE
+
+
+@dataclass(slots=True)
 class Location:
     """Location data structure."""
     latitude: float
     longitude: float
     timestamp: str = None
+    # Switch off to trust every producer, e.g. when replaying validated data
+    _VALIDATE: ClassVar[bool] = True
     
     def __post_init__(self):
         """Validate location coordinates."""
+        if not self._VALIDATE:
+            return
         if not -90 <= self.latitude <= 90:
             raise ValueError("Latitude must be between -90 and 90")
         if not -180 <= self.longitude <= 180:
             raise ValueError("Longitude must be between -180 and 180")
+    
+    @classmethod
+    def unchecked(cls, latitude: float, longitude: float, timestamp: str = None) -> "Location":
+        """Build a Location from coordinates that were already range-checked."""
+        location = object.__new__(cls)
+        location.latitude = latitude
+        location.longitude = longitude
+        location.timestamp = timestamp
+        return location
 
 
-@dataclass
+@dataclass(slots=True)
 class Geofence:
     """Geofence data structure."""
     center: Location
     radius_meters: float
+    # Center terms reused by every distance check, derived once in __post_init__
+    _center_lat_rad: float = field(init=False, repr=False, compare=False)
+    _center_lon_rad: float = field(init=False, repr=False, compare=False)
+    _cos_center_lat: float = field(init=False, repr=False, compare=False)
+    _radius_sq: float = field(init=False, repr=False, compare=False)
+    _threshold_a: float = field(init=False, repr=False, compare=False)
+    _dlat_max: float = field(init=False, repr=False, compare=False)
+    _dlon_max: float = field(init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Validate geofence parameters."""
         if self.radius_meters <= 0:
             raise ValueError("Radius must be positive")
+        
+        self._center_lat_rad = math.radians(self.center.latitude)
+        self._center_lon_rad = math.radians(self.center.longitude)
+        self._cos_center_lat = math.cos(self._center_lat_rad)
+        self._radius_sq = self.radius_meters * self.radius_meters
+        # Haversine "a" at the boundary; radii past half the globe cover everything
+        half_angle = self.radius_meters / (2 * EARTH_RADIUS_METERS)
+        self._threshold_a = math.sin(half_angle)**2 if half_angle < math.pi / 2 else 1.0
+        self._dlat_max, self._dlon_max = _shortcut_box(self.radius_meters, self._cos_center_lat)
+    
+    def contains(self, latitude: float, longitude: float) -> bool:
+        """Whether a raw coordinate lies inside the geofence."""
+        return _inside_geofence(
+            latitude, longitude, self.center.latitude, self.center.longitude,
+            self._center_lat_rad, self._center_lon_rad, self._cos_center_lat,
+            self._dlat_max, self._dlon_max, self.radius_meters
+        )
+    
+    def distance_from_center(self, latitude: float, longitude: float) -> float:
+        """Haversine distance in meters from the center to a raw coordinate."""
+        return _haversine_from_center(
+            latitude, longitude,
+            self._center_lat_rad, self._center_lon_rad, self._cos_center_lat
+        )
+
+
+class GeofenceSet:
+    """
+    Several geofences checked together, e.g. home, school and park.
+    
+    Centers and boundary thresholds are stacked into arrays so a point is
+    tested against every fence with one set of NumPy ufunc calls.
+    """
+    
+    def __init__(self, fences: List[Geofence]):
+        """
+        Initialize from a list of geofences.
+        
+        Args:
+            fences: Geofences to check against, in order
+        """
+        for fence in fences:
+            if not isinstance(fence, Geofence):
+                raise ValueError("fences must contain Geofence objects")
+        
+        self.fences = list(fences)
+        self.clat = np.array([f._center_lat_rad for f in self.fences], dtype=np.float64)
+        self.clon = np.array([f._center_lon_rad for f in self.fences], dtype=np.float64)
+        self.cos_clat = np.cos(self.clat)
+        self.thr = np.array([f._threshold_a for f in self.fences], dtype=np.float64)
+    
+    def __len__(self) -> int:
+        return len(self.fences)
+    
+    def contains(self, latitude: float, longitude: float) -> np.ndarray:
+        """
+        Check one point against every fence.
+        
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            
+        Returns:
+            Boolean mask, True for each fence containing the point
+        """
+        lat = math.radians(latitude)
+        dlat = lat - self.clat
+        dlon = math.radians(longitude) - self.clon
+        
+        a = np.sin(dlat*0.5)**2 + math.cos(lat) * self.cos_clat * np.sin(dlon*0.5)**2
+        return a <= self.thr
+
+
+class LocationBuffer:
+    """
+    Most recent locations stored column-wise in contiguous NumPy arrays.
+    
+    Latitudes and longitudes feed the batch distance functions directly
+    without unpacking Location objects. Timestamps are kept exactly as
+    given, in an object array alongside. The arrays are sized at twice the
+    capacity so that dropping old points is an occasional block copy.
+    """
+    
+    def __init__(self, capacity: int = 1000):
+        """
+        Initialize an empty buffer.
+        
+        Args:
+            capacity: Number of most recent points retained
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        
+        self.capacity = capacity
+        self.lat = np.empty(2 * capacity, dtype=np.float64)
+        self.lon = np.empty(2 * capacity, dtype=np.float64)
+        self.ts = np.empty(2 * capacity, dtype=object)
+        self._start = 0
+        self.n = 0
+    
+    def __len__(self) -> int:
+        return self.n - self._start
+    
+    def append(self, latitude: float, longitude: float, timestamp: str = None) -> None:
+        """Add a point, discarding the oldest once capacity is exceeded."""
+        if self.n == len(self.lat):
+            # Slide the retained window back to the front of the arrays
+            keep = slice(self.n - self.capacity + 1, self.n)
+            kept = self.capacity - 1
+            self.lat[:kept] = self.lat[keep]
+            self.lon[:kept] = self.lon[keep]
+            self.ts[:kept] = self.ts[keep]
+            self.n = kept
+            self._start = 0
+        
+        self.lat[self.n] = latitude
+        self.lon[self.n] = longitude
+        self.ts[self.n] = timestamp
+        self.n += 1
+        if self.n - self._start > self.capacity:
+            self._start += 1
+    
+    def append_location(self, location: Location) -> None:
+        """Add a Location."""
+        self.append(location.latitude, location.longitude, location.timestamp)
+    
+    def as_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Views of the retained (latitudes, longitudes, timestamps), oldest first."""
+        window = slice(self._start, self.n)
+        return self.lat[window], self.lon[window], self.ts[window]
+    
+    def to_locations(self, count: int = None) -> List[Location]:
+        """Rebuild Location objects for the last count points (all if None)."""
+        lats, lons, stamps = self.as_arrays()
+        if count is not None:
+            if count <= 0:
+                return []
+            lats, lons, stamps = lats[-count:], lons[-count:], stamps[-count:]
+        
+        return [
+            Location.unchecked(float(lat), float(lon), ts)
+            for lat, lon, ts in zip(lats, lons, stamps)
+        ]
 
 
 class GeofenceChecker:
     """Geofence checking functionality."""
     
-    EARTH_RADIUS = 6371000  # Earth's radius in meters
+    EARTH_RADIUS = EARTH_RADIUS_METERS
     
     @classmethod
     def haversine_distance(cls, location1: Location, location2: Location) -> float:
@@ -56,18 +370,96 @@ class GeofenceChecker:
         if not isinstance(location1, Location) or not isinstance(location2, Location):
             raise ValueError("Both arguments must be Location objects")
         
-        lat1 = math.radians(location1.latitude)
-        lon1 = math.radians(location1.longitude)
-        lat2 = math.radians(location2.latitude)
-        lon2 = math.radians(location2.longitude)
+        return haversine_meters(
+            location1.latitude, location1.longitude,
+            location2.latitude, location2.longitude
+        )
+    
+    @classmethod
+    def haversine_to_geofence(cls, location: Location, geofence: Geofence) -> float:
+        """
+        Calculate the distance from a location to a geofence center.
+        
+        Uses the center terms cached on the geofence instead of converting
+        the center on every call.
+        
+        Args:
+            location: Location to measure from
+            geofence: Geofence whose center is measured to
+            
+        Returns:
+            Distance in meters
+        """
+        if not isinstance(location, Location):
+            raise ValueError("location must be a Location object")
+        if not isinstance(geofence, Geofence):
+            raise ValueError("geofence must be a Geofence object")
+        
+        return geofence.distance_from_center(location.latitude, location.longitude)
+    
+    @classmethod
+    def equirectangular_distance(cls, location1: Location, location2: Location) -> float:
+        """
+        Approximate distance between two nearby points on a locally flat earth.
+        
+        Within ~10 km this stays within 0.1% of haversine using one cos and
+        one sqrt instead of the full trig chain.
+        
+        Args:
+            location1: First location
+            location2: Second location
+            
+        Returns:
+            Distance in meters
+        """
+        if not isinstance(location1, Location) or not isinstance(location2, Location):
+            raise ValueError("Both arguments must be Location objects")
+        
+        dx, dy = _equirect_offsets(
+            location1.latitude, location1.longitude,
+            location2.latitude, location2.longitude,
+            math.cos(math.radians((location1.latitude + location2.latitude) / 2))
+        )
+        return math.sqrt(dx*dx + dy*dy)
+    
+    @classmethod
+    def distance_array(cls, lat1, lon1, lat2, lon2) -> np.ndarray:
+        """
+        Element-wise haversine distance in meters between arrays of coordinates.
         
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
+        Arguments broadcast against each other like NumPy ufunc operands, so
+        either side may be a single point.
         
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        c = 2 * math.asin(math.sqrt(a))
+        Args:
+            lat1: Latitudes of the first points in degrees
+            lon1: Longitudes of the first points in degrees
+            lat2: Latitudes of the second points in degrees
+            lon2: Longitudes of the second points in degrees
+            
+        Returns:
+            Array of distances in meters
+        """
+        return _haversine_ufunc(
+            np.asarray(lat1, dtype=np.float64), np.asarray(lon1, dtype=np.float64),
+            np.asarray(lat2, dtype=np.float64), np.asarray(lon2, dtype=np.float64)
+        )
+    
+    @classmethod
+    def haversine_distance_batch(cls, latitudes: np.ndarray, longitudes: np.ndarray,
+                                 center_lat: float, center_lon: float) -> np.ndarray:
+        """
+        Calculate distances in meters from many points to one center at once.
         
-        return cls.EARTH_RADIUS * c
+        Args:
+            latitudes: Array of latitudes in degrees
+            longitudes: Array of longitudes in degrees
+            center_lat: Center latitude in degrees
+            center_lon: Center longitude in degrees
+            
+        Returns:
+            Array of distances in meters
+        """
+        return haversine_batch(latitudes, longitudes, center_lat, center_lon)
     
     @classmethod
     def is_inside_geofence(cls, location: Location, geofence: Geofence) -> bool:
@@ -86,7 +478,43 @@ class GeofenceChecker:
         if not isinstance(geofence, Geofence):
             raise ValueError("geofence must be a Geofence object")
         
-        distance = cls.haversine_distance(location, geofence.center)
+        # Small geofences away from the poles: flat-earth at the mean
+        # latitude, compared squared
+        if geofence.radius_meters < EQUIRECT_MAX_RADIUS_METERS and geofence._cos_center_lat > 0.1:
+            dx, dy = _equirect_offsets(
+                location.latitude, location.longitude,
+                geofence.center.latitude, geofence.center.longitude,
+                math.cos(math.radians((location.latitude + geofence.center.latitude) / 2))
+            )
+            return dx*dx + dy*dy <= geofence._radius_sq
+        
+        # Otherwise decide on the haversine term itself, skipping asin and sqrt
+        lat = math.radians(location.latitude)
+        dlat = lat - geofence._center_lat_rad
+        dlon = math.radians(location.longitude) - geofence._center_lon_rad
+        a = math.sin(dlat/2)**2 + math.cos(lat) * geofence._cos_center_lat * math.sin(dlon/2)**2
+        return a <= geofence._threshold_a
+    
+    @classmethod
+    def is_inside_geofence_batch(cls, latitudes: np.ndarray, longitudes: np.ndarray,
+                                 geofence: Geofence) -> np.ndarray:
+        """
+        Check many points against a geofence at once.
+        
+        Args:
+            latitudes: Array of latitudes in degrees
+            longitudes: Array of longitudes in degrees
+            geofence: Geofence to check against
+            
+        Returns:
+            Boolean mask, True where the point is inside the geofence
+        """
+        if not isinstance(geofence, Geofence):
+            raise ValueError("geofence must be a Geofence object")
+        
+        distance = haversine_batch(
+            latitudes, longitudes, geofence.center.latitude, geofence.center.longitude
+        )
         return distance <= geofence.radius_meters
     
     @classmethod
@@ -106,7 +534,8 @@ class GeofenceChecker:
         if not isinstance(geofence, Geofence):
             raise ValueError("geofence must be a Geofence object")
         
-        distance = cls.haversine_distance(location, geofence.center)
+        # Already validated; go straight to the raw-float kernel
+        distance = geofence.distance_from_center(location.latitude, location.longitude)
         return distance - geofence.radius_meters
     
     @classmethod
@@ -142,10 +571,34 @@ def check_location_safety(location: Location, geofence: Geofence) -> Tuple[bool,
     if not isinstance(geofence, Geofence):
         raise ValueError("geofence must be a Geofence object")
     
-    distance = GeofenceChecker.haversine_distance(location, geofence.center)
+    # Already validated; go straight to the raw-float kernel
+    distance = geofence.distance_from_center(location.latitude, location.longitude)
     is_safe = distance <= geofence.radius_meters
     
-    return is_safe, GeofenceChecker.distance_to_geofence_boundary(location, geofence)
+    return is_safe, distance - geofence.radius_meters
+
+
+def check_location_safety_batch(latitudes: np.ndarray, longitudes: np.ndarray,
+                                geofence: Geofence) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized check_location_safety for many points against one geofence.
+    
+    Args:
+        latitudes: Array of latitudes in degrees
+        longitudes: Array of longitudes in degrees
+        geofence: Geofence to check against
+        
+    Returns:
+        Tuple of (is_safe mask, distance_to_boundary array)
+    """
+    if not isinstance(geofence, Geofence):
+        raise ValueError("geofence must be a Geofence object")
+    
+    distance = haversine_batch(
+        latitudes, longitudes, geofence.center.latitude, geofence.center.longitude
+    )
+    
+    return distance <= geofence.radius_meters, distance - geofence.radius_meters
 
 
 def create_home_geofence(latitude: float, longitude: float, radius: float = 1000.0) -> Geofence:
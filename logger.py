@@ -4,46 +4,223 @@ Author: Pooja Poudel
 Purpose: Log and track system events and statistics
 """
 
+import atexit
+import bisect
+import itertools
 import json
+import os
+import queue
+import shutil
+import sys
 import time
 import threading
-from datetime import datetime
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+import weakref
+from datetime import datetime, timezone
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass
 
+from config import LoggerConfig
 
-@dataclass
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# isal's igzip writes the same gzip format using SIMD-accelerated deflate
+try:
+    from isal import igzip as gzip
+except ImportError:
+    import gzip
+
+
+# Statistics names, in their slot order in AuditLogger._stats
+_STAT_NAMES = (
+    "total_entries",
+    "location_updates",
+    "panic_events",
+    "geofence_violations",
+    "errors",
+    "dropped_writes",
+)
+_TOTAL_IDX = 0
+_DROPPED_IDX = 5
+# Counted event types, mapped to their _stats slot
+_STAT_IDX = {
+    "location_update": 1,
+    "panic": 2,
+    "geofence_violation": 3,
+    "error": 4,
+}
+# Shared str objects for the known event types
+_EVENT_TYPES = {s: sys.intern(s) for s in _STAT_IDX}
+# Pre-encoded JSON between the timestamp and details of a known event type
+_EVENT_JSON_MIDDLE = {
+    s: b',"event_type":' + json.dumps(s).encode() + b',"details":' for s in _STAT_IDX
+}
+
+
+def _intern_event_type(event_type: str) -> str:
+    """Return a shared copy of event_type so cached entries don't each hold one."""
+    interned = _EVENT_TYPES.get(event_type)
+    if interned is not None:
+        return interned
+    return sys.intern(event_type) if type(event_type) is str else event_type
+
+
+@dataclass(slots=True)
 class LogEntry:
     """Log entry data structure."""
-    timestamp: str
+    timestamp: int  # Nanoseconds since the Unix epoch
     event_type: str
     details: Dict[str, Any]
     
+    @property
+    def iso_timestamp(self) -> str:
+        """The timestamp as an ISO-8601 UTC string, for display."""
+        return datetime.fromtimestamp(self.timestamp / 1e9, tz=timezone.utc).isoformat()
+    
     def to_dict(self) -> Dict[str, Any]:
-        """Convert entry to dictionary."""
-        return asdict(self)
+        """Convert entry to dictionary (details is shared, not copied)."""
+        return {"timestamp": self.timestamp, "event_type": self.event_type, "details": self.details}
     
-    def to_json(self) -> str:
-        """Convert entry to JSON string."""
-        return json.dumps(self.to_dict())
+    def to_json(self) -> bytes:
+        """Convert entry to UTF-8 JSON bytes."""
+        # Known event types and int timestamps need only details encoded
+        middle = _EVENT_JSON_MIDDLE.get(self.event_type)
+        if middle is not None and orjson is not None and type(self.timestamp) is int:
+            return b'{"timestamp":%d%s%s}' % (
+                self.timestamp, middle, orjson.dumps(self.details, option=orjson.OPT_NON_STR_KEYS)
+            )
+        
+        data = self.to_dict()
+        if orjson is not None:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(data, separators=(",", ":")).encode()
+
+
+_STOP = object()  # Queue sentinel telling the writer thread to exit
+_OPEN_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+try:
+    _IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+
+
+def _loads(line: bytes) -> Any:
+    """Decode one JSON line."""
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+
+def _fadvise(fd: int, advice: str) -> None:
+    """Pass an access pattern hint to the kernel where posix_fadvise exists."""
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, getattr(os, advice))
+        except OSError:
+            pass
+
+
+def _tail(entries: Deque["LogEntry"], count: int) -> List["LogEntry"]:
+    """The last count items of a deque, oldest first, without copying the rest."""
+    size = len(entries)
+    return list(itertools.islice(entries, max(0, size - count), size))
+
+
+def _write_all(fd: int, bufs: List[bytes]) -> None:
+    """Write every buffer to fd, with one writev per IOV_MAX buffers where available."""
+    if hasattr(os, "writev"):
+        for i in range(0, len(bufs), _IOV_MAX):
+            chunk = bufs[i:i + _IOV_MAX]
+            written = os.writev(fd, chunk)
+            total = sum(map(len, chunk))
+            if written < total:
+                _write_fully(fd, b"".join(chunk)[written:])
+    else:
+        _write_fully(fd, b"".join(bufs))
+
+
+def _write_fully(fd: int, data: bytes) -> None:
+    """os.write until all of data is written."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
 
 
 class AuditLogger:
     """Thread-safe audit logger with statistics tracking."""
     
-    def __init__(self, log_file: str = "audit.log"):
-        """Initialize logger with log file path."""
+    FLUSH_INTERVAL_SECONDS = 1.0  # Flush a partial buffer once it is this old
+    QUEUE_SIZE = 10000  # Pending writes before new records are dropped from the file
+    DRAIN_BATCH = 1024  # Queue items serialized and written together by the writer
+    ROTATE_COMPRESSLEVEL = 1  # Fastest deflate level; archives are only slightly larger
+    ROTATE_CHUNK_SIZE = 1 << 20  # Bytes copied into the archive per read
+    INDEX_MAX_ENTRIES = 100000  # Time index size at which its oldest half is evicted
+    
+    def __init__(self, log_file: str = "audit.log",
+                 buffer_size: int = LoggerConfig.buffer_size,
+                 max_cache_size: int = LoggerConfig.max_cache_size,
+                 max_file_size: int = LoggerConfig.max_file_size):
+        """
+        Initialize logger with log file path.
+        
+        Args:
+            log_file: Path of the JSON-lines audit file
+            buffer_size: Records written before the file buffer is flushed
+            max_cache_size: Most recent entries kept in memory
+            max_file_size: Size in bytes at which the file is rotated into
+                a gzip archive; 0 disables rotation
+        """
         self.log_file = log_file
-        self._entries: List[LogEntry] = []
-        self._stats: Dict[str, int] = {
-            "total_entries": 0,
-            "location_updates": 0,
-            "panic_events": 0,
-            "geofence_violations": 0,
-            "errors": 0
-        }
+        self.buffer_size = buffer_size
+        self.max_file_size = max_file_size
+        # Byte span of each line in the file, sorted by entry timestamp for
+        # bisect; producers stamp before enqueueing, so file order can differ.
+        # Built from the file on the first time range query.
+        self._index_ts: List[int] = []
+        self._index_off: List[int] = []
+        self._index_end: List[int] = []
+        self._index_ready = False
+        self._index_floor = 0  # Lines stamped before this were evicted from the index
+        self._offset = 0  # End of the file as written by this logger
+        # Kept open for the logger's lifetime; reopened on flush if this fails
+        self._fd: Optional[int] = None
+        try:
+            self._fd = self._open_log()
+        except OSError as e:
+            print(f"Error opening log file: {e}")
+        # Encoded lines and their timestamps awaiting the next flush, and the records they hold
+        self._buffer: List[bytes] = []
+        self._buffer_ts: List[int] = []
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._closed = False
+        # Oldest entries fall off once max_cache_size is reached; all stay on disk
+        self._entries: Deque[LogEntry] = deque(maxlen=max_cache_size)
+        # The same entries split by event type, so typed reads skip the scan
+        self._by_type: Dict[str, Deque[LogEntry]] = defaultdict(
+            lambda: deque(maxlen=max_cache_size)
+        )
+        # Counters indexed as in _STAT_NAMES
+        self._stats = [0] * len(_STAT_NAMES)
+        # All-time count of every event type, including uncounted ones
+        self._type_counts: Counter = Counter()
         self._lock = threading.Lock()
         self._file_lock = threading.Lock()
+        
+        # Callers only enqueue entries; this thread serializes them and does the file I/O
+        self._q: queue.Queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._writer = threading.Thread(
+            target=self._drain,
+            args=(weakref.ref(self), self._q, self.FLUSH_INTERVAL_SECONDS),
+            daemon=True
+        )
+        self._writer.start()
+        # Rotated files are compressed here so the flush path only pays for a rename
+        self._rotate_pool = ThreadPoolExecutor(max_workers=1)
+        # The writer is a daemon thread; make sure buffered records reach disk at exit
+        _open_loggers.add(self)
     
     def log_event(self, event_type: str, details: Dict[str, Any]) -> None:
         """Log an event with type and details."""
@@ -53,57 +230,396 @@ class AuditLogger:
             raise ValueError("Details must be a dictionary")
         
         entry = LogEntry(
-            timestamp=datetime.utcnow().isoformat(),
-            event_type=event_type,
+            timestamp=time.time_ns(),
+            event_type=_intern_event_type(event_type),
             details=details
         )
         
         with self._lock:
-            self._entries.append(entry)
-            self._stats["total_entries"] += 1
+            self._record(entry)
+        
+        self._enqueue((entry,))
+    
+    @staticmethod
+    def _serialize(batches: List[Tuple[LogEntry, ...]]) -> Tuple[List[bytes], List[int]]:
+        """Encode entries as JSON lines with their timestamps, skipping any that fail."""
+        lines = []
+        stamps = []
+        for batch in batches:
+            for entry in batch:
+                try:
+                    lines.append(entry.to_json() + b"\n")
+                except Exception as e:
+                    print(f"Error serializing log entry: {e}")
+                    continue
+                stamps.append(entry.timestamp)
+        return lines, stamps
+    
+    def _enqueue(self, entries: Tuple[LogEntry, ...]) -> None:
+        """Hand entries to the writer thread without blocking."""
+        # Checked under the lock so nothing is queued once close() has begun
+        with self._lock:
+            if not self._closed:
+                try:
+                    self._q.put_nowait(entries)
+                except queue.Full:
+                    self._stats[_DROPPED_IDX] += len(entries)
+                return
+        
+        # No writer thread any more; write through and leave no descriptor open
+        self._write(*self._serialize([entries]), len(entries))
+        with self._file_lock:
+            self._flush_buffer_locked()
+            self._close_fd()
+    
+    @staticmethod
+    def _drain(ref: "weakref.ref[AuditLogger]", q: queue.Queue, interval: float) -> None:
+        """
+        Writer thread: move queued entries to the file until told to stop.
+        
+        The logger is only referenced while a batch is handled, so one that
+        is dropped without close() can still be collected; the thread then
+        exits at its next wakeup.
+        """
+        while True:
+            try:
+                item = q.get(timeout=interval)
+            except queue.Empty:
+                logger = ref()
+                if logger is None:
+                    return
+                # Idle; don't leave a partial buffer sitting in memory
+                if logger._pending:
+                    logger._flush_buffer()
+                del logger
+                continue
+            
+            # Take whatever else is already queued so it goes out in one write
+            batches = []
+            stop = False
+            while True:
+                if item is _STOP:
+                    stop = True
+                else:
+                    batches.append(item)
+                if stop or len(batches) >= AuditLogger.DRAIN_BATCH:
+                    break
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    break
             
-            # Update specific counters
-            if event_type == "location_update":
-                self._stats["location_updates"] += 1
-            elif event_type == "panic":
-                self._stats["panic_events"] += 1
-            elif event_type == "geofence_violation":
-                self._stats["geofence_violations"] += 1
-            elif event_type == "error":
-                self._stats["errors"] += 1
-        
-        # Write to file
+            logger = ref()
+            try:
+                if batches and logger is not None:
+                    logger._write(*logger._serialize(batches), sum(len(b) for b in batches))
+            finally:
+                for _ in range(len(batches) + stop):
+                    q.task_done()
+            if stop or logger is None:
+                return
+            del logger
+    
+    def _open_log(self) -> int:
+        """Open the log file for appending and return its descriptor."""
+        fd = os.open(self.log_file, _OPEN_FLAGS, 0o644)
+        self._offset = os.fstat(fd).st_size
+        # Closes the descriptor if the logger is collected without close();
+        # at exit _close_open_loggers flushes and closes instead
+        self._fd_finalizer = weakref.finalize(self, os.close, fd)
+        self._fd_finalizer.atexit = False
+        return fd
+    
+    def _close_fd(self) -> None:
+        """Close the log file descriptor; caller holds self._file_lock."""
+        if self._fd is not None:
+            self._fd_finalizer()
+            self._fd = None
+    
+    def _scan_lines(self):
+        """Yield (offset, line) for each line of the file; caller holds self._file_lock."""
+        offset = 0
+        with open(self.log_file, "rb") as f:
+            _fadvise(f.fileno(), "POSIX_FADV_SEQUENTIAL")
+            for line in f:
+                if offset + len(line) > self._offset:
+                    break
+                yield offset, line
+                offset += len(line)
+    
+    def _reset_index(self, ready: bool) -> None:
+        """Drop the time index; ready=True when the file is empty. Caller holds self._file_lock."""
+        self._index_ts = []
+        self._index_off = []
+        self._index_end = []
+        self._index_ready = ready
+        self._index_floor = 0
+    
+    def _load_index(self) -> None:
+        """Index the lines already in the log file; caller holds self._file_lock."""
+        self._reset_index(True)
+        for offset, line in self._scan_lines():
+            try:
+                timestamp = _loads(line)["timestamp"]
+            except Exception:
+                timestamp = None
+            # Lines with older string timestamps are left out of the index
+            if type(timestamp) is int:
+                self._add_to_index(timestamp, offset, offset + len(line))
+    
+    def _add_to_index(self, timestamp: int, offset: int, end: int) -> None:
+        """Record where a line lies; caller holds self._file_lock."""
+        if timestamp < self._index_floor:
+            return
+        # Late entries are usually only slightly out of order, so this
+        # insertion point is near the end of the lists
+        i = bisect.bisect_right(self._index_ts, timestamp)
+        self._index_ts.insert(i, timestamp)
+        self._index_off.insert(i, offset)
+        self._index_end.insert(i, end)
+        
+        # Without rotation the file grows forever; keep the newest half and
+        # let queries reaching further back scan the file instead
+        if len(self._index_ts) > self.INDEX_MAX_ENTRIES:
+            drop = len(self._index_ts) // 2
+            self._index_floor = self._index_ts[drop - 1] + 1
+            del self._index_ts[:drop]
+            del self._index_off[:drop]
+            del self._index_end[:drop]
+    
+    def _write(self, lines: List[bytes], stamps: List[int], records: int) -> None:
+        """Buffer encoded lines, flushing every buffer_size records or FLUSH_INTERVAL_SECONDS."""
         with self._file_lock:
+            self._buffer.extend(lines)
+            self._buffer_ts.extend(stamps)
+            self._pending += records
+            if (self._pending >= self.buffer_size
+                    or time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL_SECONDS):
+                self._flush_buffer_locked()
+    
+    def force_flush(self) -> None:
+        """Wait for queued records and push them to the log file."""
+        if not self._closed:
+            self._q.join()
+        self._flush_buffer()
+    
+    def _flush_buffer(self) -> None:
+        """Write buffered lines to the log file."""
+        with self._file_lock:
+            self._flush_buffer_locked()
+    
+    def _flush_buffer_locked(self) -> None:
+        """Write buffered lines to the log file; caller holds self._file_lock."""
+        bufs = self._buffer
+        stamps = self._buffer_ts
+        self._buffer = []
+        self._buffer_ts = []
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        if not bufs:
+            return
+        try:
+            if self._fd is None:
+                self._fd = self._open_log()
+            _write_all(self._fd, bufs)
+        except Exception as e:
+            print(f"Error writing to log file: {e}")
+            return
+        
+        offset = self._offset
+        if self._index_ready:
+            for line, timestamp in zip(bufs, stamps):
+                self._add_to_index(timestamp, offset, offset + len(line))
+                offset += len(line)
+        else:
+            offset += sum(len(line) for line in bufs)
+        self._offset = offset
+        
+        if self.max_file_size and offset >= self.max_file_size:
             try:
-                with open(self.log_file, "a") as f:
-                    f.write(entry.to_json() + "\n")
+                self._rotate_log()
             except Exception as e:
-                print(f"Error writing to log file: {e}")
+                print(f"Error rotating log file: {e}")
+    
+    def _rotate_log(self) -> None:
+        """
+        Move the current log file aside and start a new one; caller holds
+        self._file_lock.
+        
+        The moved file is gzipped on self._rotate_pool, or inline once
+        close() has begun. Time range queries only cover the current file
+        afterwards.
+        """
+        self._close_fd()
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        raw = f"{self.log_file}.{stamp}"
+        os.replace(self.log_file, raw)
+        
+        self._reset_index(True)
+        self._fd = self._open_log()
+        # close() shuts the pool down under self._file_lock after setting
+        # _closed, so a submit here can never reach a dead pool
+        if self._closed:
+            self._compress_archive(raw)
+        else:
+            self._rotate_pool.submit(self._compress_archive, raw)
+    
+    @classmethod
+    def _compress_archive(cls, raw: str) -> None:
+        """Gzip a rotated log file into raw + ".gz" and remove the original."""
+        try:
+            with open(raw, "rb") as f_in, \
+                    gzip.open(raw + ".gz", "wb", compresslevel=cls.ROTATE_COMPRESSLEVEL) as f_out:
+                shutil.copyfileobj(f_in, f_out, cls.ROTATE_CHUNK_SIZE)
+                # The rotated file is never read again; write back any dirty
+                # pages so DONTNEED can drop all of it from the page cache
+                os.fsync(f_in.fileno())
+                _fadvise(f_in.fileno(), "POSIX_FADV_DONTNEED")
+            os.remove(raw)
+        except Exception as e:
+            print(f"Error compressing rotated log file: {e}")
+    
+    def get_entries_by_time_range(self, start_ns: int, end_ns: int) -> List[LogEntry]:
+        """
+        Read logged entries with start_ns <= timestamp <= end_ns back from the file.
+        
+        Only the byte range covering the matching lines is read, unless the
+        range reaches back past what the index still holds. Entries still
+        queued for the writer are flushed first. Results are in timestamp
+        order.
+        """
+        self.force_flush()
+        # Held throughout so the file is not rotated, truncated or appended
+        # to between the index lookup and the read
+        with self._file_lock:
+            try:
+                if not self._index_ready:
+                    self._load_index()
+                if start_ns < self._index_floor:
+                    lines = [line for _, line in self._scan_lines()]
+                else:
+                    lo = bisect.bisect_left(self._index_ts, start_ns)
+                    hi = bisect.bisect_right(self._index_ts, end_ns)
+                    if lo >= hi:
+                        return []
+                    lines = self._read_span(
+                        min(self._index_off[lo:hi]), max(self._index_end[lo:hi])
+                    ).splitlines()
+            except OSError as e:
+                print(f"Error reading log file: {e}")
+                return []
+        
+        entries = []
+        for line in lines:
+            try:
+                record = _loads(line)
+            except Exception:
+                continue
+            timestamp = record.get("timestamp")
+            if type(timestamp) is int and start_ns <= timestamp <= end_ns:
+                entries.append(LogEntry(timestamp, record["event_type"], record["details"]))
+        entries.sort(key=lambda entry: entry.timestamp)
+        return entries
+    
+    def _read_span(self, start: int, stop: int) -> bytes:
+        """Read bytes [start, stop) of the log file; caller holds self._file_lock."""
+        fd = os.open(self.log_file, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            if hasattr(os, "pread"):
+                return os.pread(fd, stop - start, start)
+            os.lseek(fd, start, os.SEEK_SET)
+            return os.read(fd, stop - start)
+        finally:
+            os.close(fd)
+    
+    def close(self) -> None:
+        """Write out queued records, stop the writer thread and close the log file."""
+        with self._lock:
+            closing = not self._closed
+            self._closed = True
+        
+        if closing:
+            self._q.put(_STOP)
+            self._writer.join()
+            _open_loggers.discard(self)
+            # Anything still queued (e.g. behind _STOP) is written here
+            leftovers = []
+            while True:
+                try:
+                    item = self._q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    leftovers.append(item)
+                self._q.task_done()
+            if leftovers:
+                self._write(*self._serialize(leftovers), sum(len(b) for b in leftovers))
+        
+        with self._file_lock:
+            self._flush_buffer_locked()
+            self._close_fd()
+            # Archives from earlier rotations are finished before returning
+            self._rotate_pool.shutdown(wait=True)
+    
+    def _record(self, entry: LogEntry) -> None:
+        """Store an entry and update counters; caller holds self._lock."""
+        self._entries.append(entry)
+        self._by_type[entry.event_type].append(entry)
+        self._type_counts[entry.event_type] += 1
+        self._stats[_TOTAL_IDX] += 1
+        
+        # Update specific counters
+        idx = _STAT_IDX.get(entry.event_type)
+        if idx is not None:
+            self._stats[idx] += 1
     
     def get_recent_entries(self, count: int = 10) -> List[LogEntry]:
         """Get most recent log entries."""
         with self._lock:
-            return self._entries[-count:]
+            return _tail(self._entries, count)
+    
+    def get_entries_by_type(self, event_type: str, count: int = 10) -> List[LogEntry]:
+        """Get the most recent entries of one event type."""
+        with self._lock:
+            entries = self._by_type.get(event_type)
+            return _tail(entries, count) if entries else []
+    
+    def get_recent_alerts(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the details of the most recent "alert" events."""
+        return [entry.details for entry in self.get_entries_by_type("alert", limit)]
+    
+    def get_recent_locations(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the details of the most recent "location_update" events."""
+        return [entry.details for entry in self.get_entries_by_type("location_update", limit)]
     
     def get_statistics(self) -> Dict[str, int]:
         """Get current statistics."""
         with self._lock:
-            return self._stats.copy()
+            return dict(zip(_STAT_NAMES, self._stats))
+    
+    def get_event_counts(self) -> Dict[str, int]:
+        """Get how many events of each type have been logged since the last clear."""
+        with self._lock:
+            return dict(self._type_counts)
     
     def clear(self) -> None:
         """Clear all entries and reset statistics."""
         with self._lock:
             self._entries.clear()
-            self._stats = {
-                "total_entries": 0,
-                "location_updates": 0,
-                "panic_events": 0,
-                "geofence_violations": 0,
-                "errors": 0
-            }
-        
-        # Clear log file
+            self._by_type.clear()
+            self._type_counts.clear()
+            self._stats = [0] * len(_STAT_NAMES)
+        
+        # Clear log file once earlier records have been written
+        if not self._closed:
+            self._q.join()
         with self._file_lock:
+            self._buffer = []
+            self._buffer_ts = []
+            self._pending = 0
+            self._reset_index(True)
+            self._offset = 0
+            self._close_fd()
             try:
                 with open(self.log_file, "w") as f:
                     f.write("")
@@ -111,6 +627,20 @@ class AuditLogger:
                 print(f"Error clearing log file: {e}")
 
 
+# Loggers not closed yet, held weakly so that tracking them keeps none alive
+_open_loggers: "weakref.WeakSet[AuditLogger]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_loggers() -> None:
+    """Write out and close every logger still open at interpreter exit."""
+    for logger in list(_open_loggers):
+        try:
+            logger.close()
+        except Exception as e:
+            print(f"Error closing audit logger: {e}")
+
+
 # Convenience functions
 def create_logger(log_file: Optional[str] = None) -> AuditLogger:
     """Create a new audit logger instance."""
@@ -6,11 +6,13 @@ Purpose: Parent monitoring interface with ASCII map and alerts
 """
 
 import asyncio
+import functools
 import json
 import time
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 import httpx
+import numpy as np
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
@@ -25,6 +27,16 @@ from simulator import EmergencyState
 from config import get_config, get_ui_config
 
 
+@functools.lru_cache(maxsize=64)
+def _ring_offsets(center_x: int, center_y: int, radius_pixels: int,
+                  map_size: int) -> Tuple[int, ...]:
+    """Map buffer offsets of cells within one cell of the given circle, computed with NumPy."""
+    ys, xs = np.ogrid[:map_size, :map_size]
+    mask = np.abs(np.hypot(xs - center_x, ys - center_y) - radius_pixels) < 1
+    ys, xs = np.nonzero(mask)
+    return tuple((ys * (map_size + 1) + xs).tolist())
+
+
 class ParentConsole:
     """Rich terminal-based parent monitoring console with optimizations."""
     
@@ -40,7 +52,11 @@ class ParentConsole:
         self.api_url = api_url or self.config.get_api_url()
         
         self.console = Console()
-        self.client = httpx.AsyncClient(timeout=self.config.api.request_timeout)
+        # One pooled client for every poll, so requests reuse kept-alive connections
+        self.client = httpx.AsyncClient(
+            timeout=self.config.api.request_timeout,
+            limits=httpx.Limits(max_keepalive_connections=4)
+        )
         
         # State variables
         self.current_location: Optional[Location] = None
@@ -84,11 +100,14 @@ class ParentConsole:
     async def _update_data(self):
         """Update data from the API with improved error handling."""
         try:
-            # Update status and location
-            await self._update_status()
-            
-            # Update alerts
-            await self._update_alerts()
+            # Status and alerts are independent, so fetch them concurrently;
+            # the geofence is only fetched once status says one is active
+            geofence_active, _ = await asyncio.gather(
+                self._update_status(fetch_geofence=False),
+                self._update_alerts()
+            )
+            if geofence_active:
+                await self._update_geofence()
             
             self.last_update_time = datetime.now()
             
@@ -99,9 +118,18 @@ class ParentConsole:
         except Exception as e:
             self.console.print(f"[red]Error updating data: {e}[/red]")
     
-    async def _update_status(self):
-        """Update status data from API."""
+    async def _update_status(self, fetch_geofence: bool = True) -> bool:
+        """
+        Update status data from API.
+        
+        Args:
+            fetch_geofence: Also update the geofence when one is active
+            
+        Returns:
+            Whether the API reports an active geofence
+        """
         response = await self.client.get(f"{self.api_url}/status")
+        geofence_active = False
         if response.status_code == 200:
             status_data = response.json()
             
@@ -118,8 +146,10 @@ class ParentConsole:
             self.emergency_state = EmergencyState(status_data.get("emergency_state", "normal"))
             
             # Update geofence status
-            if status_data.get("geofence_active"):
+            geofence_active = bool(status_data.get("geofence_active"))
+            if geofence_active and fetch_geofence:
                 await self._update_geofence()
+        return geofence_active
     
     async def _update_alerts(self):
         """Update alerts from API."""
@@ -206,19 +236,20 @@ class ParentConsole:
             return Panel("No location data available", title="Location Map")
         
         map_size = self.ui_config.map_size
-        map_chars = [[" " for _ in range(map_size)] for _ in range(map_size)]
+        # One byte per cell, rows separated by newlines; cell (x, y) is at y * (map_size + 1) + x
+        map_buf = bytearray(b"\n".join([b" " * map_size] * map_size))
         
         # Place home/geofence center
         if self.geofence:
             center_x = map_size // 2
             center_y = map_size // 2
-            map_chars[center_y][center_x] = "H"
+            map_buf[center_y * (map_size + 1) + center_x] = ord("H")
             
             # Draw geofence boundary (optimized calculation)
             radius_pixels = min(self.ui_config.geofence_display_radius, 
                               int(self.geofence.radius_meters / 250))  # Rough scale
             
-            self._draw_geofence_boundary(map_chars, center_x, center_y, radius_pixels, map_size)
+            self._draw_geofence_boundary(map_buf, center_x, center_y, radius_pixels, map_size)
         
         # Place child location
         if self.current_location and self.geofence:
@@ -226,28 +257,26 @@ class ParentConsole:
             
             # Check if child is in safe zone
             is_safe, distance = check_location_safety(self.current_location, self.geofence)
-            child_icon = "C" if is_safe else "!"
+            child_icon = ord("C") if is_safe else ord("!")
             
             # Ensure within bounds and place icon
             if 0 <= child_x < map_size and 0 <= child_y < map_size:
-                map_chars[child_y][child_x] = child_icon
+                map_buf[child_y * (map_size + 1) + child_x] = child_icon
         
-        # Convert to string more efficiently
-        map_str = "\n".join("".join(row) for row in map_chars)
+        map_str = map_buf.decode("ascii")
         
         # Add legend
         legend = "\n\nLegend: H Home | C Child (Safe) | ! Child (Alert) | . Geofence"
         
         return Panel(map_str + legend, title="Location Map", border_style="green")
     
-    def _draw_geofence_boundary(self, map_chars: list, center_x: int, center_y: int, 
+    def _draw_geofence_boundary(self, map_buf: bytearray, center_x: int, center_y: int, 
                                radius_pixels: int, map_size: int):
-        """Draw geofence boundary on the map efficiently."""
-        for y in range(map_size):
-            for x in range(map_size):
-                distance = ((x - center_x) ** 2 + (y - center_y) ** 2) ** 0.5
-                if abs(distance - radius_pixels) < 1:
-                    map_chars[y][x] = "."
+        """Draw geofence boundary into the map buffer efficiently."""
+        # The ring only changes with the map size or geofence radius
+        dot = ord(".")
+        for offset in _ring_offsets(center_x, center_y, radius_pixels, map_size):
+            map_buf[offset] = dot
     
     def _calculate_child_position(self, map_size: int) -> tuple[int, int]:
         """Calculate child position on the map using configuration scale factor."""
@@ -11,9 +11,11 @@ import threading
 from typing import Generator, Optional, Callable, List, Dict, Any
 from dataclasses import dataclass
 from enum import Enum
-from geofence import Location
+from geofence import Location, LocationBuffer
 from datetime import datetime
 
+import numpy as np
+
 
 class EmergencyState(str, Enum):
     """Emergency state enumeration."""
@@ -62,11 +64,16 @@ class GPSSimulator:
         self._state_lock = threading.Lock()
         self._location_callbacks: List[Callable[[Location], None]] = []
         self._emergency_callbacks: List[Callable[[EmergencyState], None]] = []
+        self._location_batch_callbacks: List[Callable[[List[Location]], None]] = []
     
     def add_location_callback(self, callback: Callable[[Location], None]) -> None:
         """Add callback for location updates."""
         self._location_callbacks.append(callback)
     
+    def add_location_batch_callback(self, callback: Callable[[List[Location]], None]) -> None:
+        """Add callback receiving every point of a set_locations catch-up at once."""
+        self._location_batch_callbacks.append(callback)
+    
     def add_emergency_callback(self, callback: Callable[[EmergencyState], None]) -> None:
         """Add callback for emergency state changes."""
         self._emergency_callbacks.append(callback)
@@ -79,6 +86,14 @@ class GPSSimulator:
             except Exception as e:
                 print(f"Error in location callback: {e}")
     
+    def _notify_location_batch_callbacks(self, locations: List[Location]) -> None:
+        """Notify all location batch callbacks."""
+        for callback in self._location_batch_callbacks:
+            try:
+                callback(locations)
+            except Exception as e:
+                print(f"Error in location batch callback: {e}")
+    
     def _notify_emergency_callbacks(self, state: EmergencyState) -> None:
         """Notify all emergency callbacks."""
         for callback in self._emergency_callbacks:
@@ -105,10 +120,9 @@ class GPSSimulator:
         new_lat = max(-90, min(90, new_lat))
         new_lon = max(-180, min(180, new_lon))
         
-        self.current_location = Location(
-            latitude=new_lat,
-            longitude=new_lon,
-            timestamp=datetime.utcnow().isoformat()
+        # Clamped above, so the per-tick range checks can be skipped
+        self.current_location = Location.unchecked(
+            new_lat, new_lon, datetime.utcnow().isoformat()
         )
         self._notify_location_callbacks(self.current_location)
     
@@ -170,6 +184,24 @@ class GPSSimulator:
             self.current_location = location
             self._notify_location_callbacks(location)
     
+    def set_locations(self, locations: List[Location]) -> None:
+        """
+        Catch up on several buffered locations, e.g. after a signal-loss gap.
+        
+        Batch callbacks receive every point in one call; per-point location
+        callbacks are notified only of the final, current location.
+        """
+        if not locations:
+            return
+        for location in locations:
+            if not isinstance(location, Location):
+                raise ValueError("locations must contain Location objects")
+        
+        with self._state_lock:
+            self.current_location = locations[-1]
+            self._notify_location_batch_callbacks(locations)
+            self._notify_location_callbacks(locations[-1])
+    
     def trigger_panic(self) -> None:
         """Trigger panic state."""
         with self._state_lock:
@@ -201,7 +233,8 @@ class LocationGenerator:
     def __init__(self, simulator: GPSSimulator):
         """Initialize with simulator."""
         self.simulator = simulator
-        self._locations: List[Location] = []
+        # Keep only the last 1000 locations
+        self._locations = LocationBuffer(capacity=1000)
         self._lock = threading.Lock()
         
         # Add callback to track locations
@@ -210,17 +243,18 @@ class LocationGenerator:
     def _on_location_update(self, location: Location) -> None:
         """Handle location updates."""
         with self._lock:
-            self._locations.append(location)
-            # Keep only last 1000 locations
-            if len(self._locations) > 1000:
-                self._locations.pop(0)
+            self._locations.append_location(location)
     
     def generate_locations(self, count: int = 10) -> List[Location]:
         """Generate a stream of locations."""
         with self._lock:
-            if not self._locations:
-                return []
-            return self._locations[-count:]
+            return self._locations.to_locations(count)
+    
+    def get_location_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """Copies of the recent latitudes and longitudes for batch geofence checks."""
+        with self._lock:
+            lats, lons, _ = self._locations.as_arrays()
+            return lats.copy(), lons.copy()
     
     def get_simulator(self) -> GPSSimulator:
         """Get the underlying simulator."""
@@ -7,7 +7,7 @@ Purpose: Happy/negative path + schema validation testing for FastAPI endpoints
 import pytest
 import json
 from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch, AsyncMock
+from unittest.mock import Mock, patch, AsyncMock, call
 from api import app
 from geofence import Location, Geofence
 from simulator import EmergencyState
@@ -128,6 +128,16 @@ class TestAPIModels:
         assert status.emergency_state == "normal"
         assert status.geofence_active is True
         assert status.last_update == "2024-01-01T12:00:00"
+    
+    def test_now_iso_is_utc(self):
+        """Test generated timestamps carry an explicit UTC offset."""
+        import time
+        from datetime import datetime
+        from api import now_iso
+        
+        stamp = now_iso()
+        assert stamp.endswith("+00:00")
+        assert abs(datetime.fromisoformat(stamp).timestamp() - time.time()) < 1
 
 
 class TestAPIEndpoints:
@@ -305,6 +315,16 @@ class TestAPIEndpoints:
             "radius_meters": -1.0
         })
         assert response.status_code == 422  # Validation error
+        
+        # Invalid center coordinates
+        response = self.client.post("/geofence", json={
+            "center": {
+                "latitude": -90.5,
+                "longitude": 180.5
+            },
+            "radius_meters": 1000.0
+        })
+        assert response.status_code == 422  # Validation error
     
     @patch('api.simulator')
     @patch('api.audit_logger')
@@ -389,7 +409,7 @@ class TestAPIEndpoints:
     @patch('api.audit_logger')
     def test_get_alerts_success(self, mock_audit_logger):
         """Test successful alert retrieval."""
-        mock_audit_logger.get_recent_entries.return_value = [
+        mock_audit_logger.get_recent_alerts.return_value = [
             {
                 "type": "geofence_exit",
                 "message": "Child left safe zone",
@@ -442,6 +462,137 @@ class TestWebSocketEndpoint:
             # WebSocketTestSession doesn't have a 'closed' attribute
             assert True  # Connection was successfully closed
 
+    def test_websocket_receives_broadcast(self):
+        """Test broadcast alerts are delivered to connected clients."""
+        from api import AlertModel, broadcast_alert
+
+        with self.client.websocket_connect("/ws") as websocket:
+            alert = AlertModel(type="geofence_exit", message="Child left safe zone", severity="high")
+            websocket.portal.call(broadcast_alert, alert.model_dump_json().encode())
+
+            data = json.loads(websocket.receive_bytes())
+            assert data["type"] == "geofence_exit"
+            assert data["severity"] == "high"
+    
+    def test_broadcast_survives_repeated_lifespans(self):
+        """Test alerts still reach clients when the app is started a second time."""
+        from api import handle_emergency_update
+        import api
+        
+        for _ in range(2):
+            with TestClient(app) as client:
+                with client.websocket_connect("/ws") as websocket:
+                    websocket.portal.call(handle_emergency_update, EmergencyState.PANIC)
+                    
+                    data = json.loads(websocket.receive_bytes())
+                    assert data["batch"][0]["type"] == "emergency_state_change"
+            assert api._broadcast_queue is None
+    
+    @pytest.mark.asyncio
+    async def test_shutdown_without_startup(self):
+        """Test shutdown still stops the simulator when startup never created the lock."""
+        import api
+        
+        mock_simulator = Mock()
+        with patch.object(api, '_global_state_lock', None), \
+             patch.object(api, 'simulator', mock_simulator), \
+             patch.object(api, 'audit_logger', None):
+            await api.shutdown_event()
+        
+        mock_simulator.stop.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_websocket_writer_drops_failed_connection(self):
+        """Test a connection whose send fails is unregistered by its writer."""
+        import asyncio
+        from api import _websocket_writer, websocket_connections
+        
+        connection = AsyncMock()
+        connection.send_bytes.side_effect = RuntimeError("socket closed")
+        queue = asyncio.Queue()
+        queue.put_nowait(b"{}")
+        websocket_connections.add((connection, queue))
+        
+        await _websocket_writer(connection, queue)
+        
+        assert (connection, queue) not in websocket_connections
+        connection.close.assert_awaited_once()
+
+
+class TestAlertHandlers:
+    """Test cases for simulator callback handlers."""
+    
+    @pytest.mark.asyncio
+    @patch('api._broadcast_queue')
+    @patch('api.audit_logger')
+    async def test_handle_emergency_update_panic(self, mock_audit_logger, mock_queue):
+        """Test panic state change produces a critical alert."""
+        from api import handle_emergency_update
+        
+        await handle_emergency_update(EmergencyState.PANIC)
+        
+        alert = mock_queue.put_nowait.call_args[0][0]
+        assert alert["type"] == "emergency_state_change"
+        assert alert["severity"] == "critical"
+        assert alert["details"] == {"state": "panic"}
+        assert alert["timestamp"]
+        mock_audit_logger.log_event.assert_called_once_with("alert", alert)
+    
+    @pytest.mark.asyncio
+    @patch('api._broadcast_queue')
+    @patch('api.audit_logger')
+    @patch('api.geofence', Geofence(Location(0.0, 0.0), 1000.0))
+    async def test_handle_location_update_outside_geofence(self, mock_audit_logger, mock_queue):
+        """Test leaving the geofence produces a geofence_exit alert."""
+        from api import handle_location_update
+        
+        await handle_location_update(Location(0.015, 0.0, "2024-01-01T12:00:00"))
+        
+        alert = mock_queue.put_nowait.call_args[0][0]
+        assert alert["type"] == "geofence_exit"
+        assert alert["location"]["latitude"] == 0.015
+        assert alert["details"]["distance"] > 0
+        assert mock_audit_logger.log_event.call_args_list == [
+            call("alert", alert),
+            call("location_update", {
+                "latitude": 0.015, "longitude": 0.0, "timestamp": "2024-01-01T12:00:00"
+            }),
+        ]
+    
+    @pytest.mark.asyncio
+    @patch('api._broadcast_queue')
+    @patch('api.audit_logger')
+    @patch('api.geofence', Geofence(Location(0.0, 0.0), 1000.0))
+    async def test_handle_location_update_inside_geofence(self, mock_audit_logger, mock_queue):
+        """Test staying inside the geofence produces no alert."""
+        from api import handle_location_update
+        
+        await handle_location_update(Location(0.005, 0.0, "2024-01-01T12:00:00"))
+        
+        mock_queue.put_nowait.assert_not_called()
+        mock_audit_logger.log_event.assert_called_once_with("location_update", {
+            "latitude": 0.005, "longitude": 0.0, "timestamp": "2024-01-01T12:00:00"
+        })
+    
+    @pytest.mark.asyncio
+    @patch('api.broadcast_alert', new_callable=AsyncMock)
+    async def test_broadcast_flusher_coalesces_alerts(self, mock_broadcast):
+        """Test queued alerts are sent together as one batch frame."""
+        import asyncio
+        from api import _broadcast_flusher
+        
+        queue = asyncio.Queue()
+        for i in range(3):
+            queue.put_nowait({"type": "test", "index": i})
+        
+        task = asyncio.create_task(_broadcast_flusher(queue))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        
+        mock_broadcast.assert_called_once()
+        frame = json.loads(mock_broadcast.call_args[0][0])
+        assert [alert["index"] for alert in frame["batch"]] == [0, 1, 2]
+
 
 class TestErrorHandling:
     """Test cases for error handling."""
@@ -491,7 +642,7 @@ class TestIntegrationScenarios:
         mock_geofence.radius_meters = 1000.0
         
         # Mock logger
-        mock_audit_logger.get_recent_entries.return_value = []
+        mock_audit_logger.get_recent_alerts.return_value = []
         
         # Test workflow
         response = self.client.get("/status")
@@ -6,14 +6,17 @@ Purpose: Child device simulation and UI testing
 
 import pytest
 import asyncio
+import io
 import signal
-from unittest.mock import Mock, patch, AsyncMock, MagicMock
+import time
+from unittest.mock import Mock, patch, AsyncMock, MagicMock, PropertyMock
 from datetime import datetime
 import httpx
+import orjson
 from rich.console import Console
 from rich.panel import Panel
 
-from child_simulator import ChildSimulator
+from child_simulator import ChildSimulator, check_location_safety
 from geofence import Location, Geofence
 from simulator import EmergencyState, GPSSimulator, SimulatorConfig
 
@@ -81,7 +84,7 @@ class TestChildSimulator:
             # Mock HTTP response
             mock_response = Mock()
             mock_response.status_code = 200
-            mock_response.json.return_value = {
+            mock_response.content = orjson.dumps({
                 "current_location": {
                     "latitude": 40.7128,
                     "longitude": -74.0060,
@@ -89,21 +92,141 @@ class TestChildSimulator:
                 },
                 "emergency_state": "normal",
                 "geofence_active": True
-            }
+            })
             
             with patch.object(child_sim.client, 'get', return_value=mock_response) as mock_get, \
-                 patch.object(child_sim, '_update_geofence') as mock_update_geofence:
+                 patch.object(child_sim, '_apply_geofence') as mock_apply_geofence:
                 
                 await child_sim._update_data()
                 
-                mock_get.assert_called_once_with(f"{child_sim.api_url}/status")
-                mock_update_geofence.assert_called_once()
+                # Status and geofence are fetched together in one tick
+                assert mock_get.call_count == 2
+                mock_get.assert_any_call(f"{child_sim.api_url}/status")
+                mock_get.assert_any_call(f"{child_sim.api_url}/geofence")
+                mock_apply_geofence.assert_called_once_with(mock_response)
                 
                 # Verify location was updated
                 assert child_sim.current_location is not None
                 assert child_sim.current_location.latitude == 40.7128
                 assert child_sim.current_location.longitude == -74.0060
                 assert child_sim.emergency_state == EmergencyState.NORMAL
+                _, values = child_sim._status_grid
+                child_sim._create_status()
+                assert values[2].plain == time.strftime(
+                    "%H:%M:%S", time.localtime(child_sim.last_update_time)
+                )
+    
+    @pytest.mark.asyncio
+    async def test_update_data_fetches_geofence_only_while_active(self):
+        """Test /geofence is only requested once status reports an active geofence."""
+        with patch('child_simulator.GPSSimulator'), \
+             patch('child_simulator.signal.signal'):
+            child_sim = ChildSimulator()
+            
+            mock_response = Mock()
+            mock_response.status_code = 200
+            mock_response.content = orjson.dumps({
+                "emergency_state": "normal",
+                "geofence_active": False
+            })
+            
+            with patch.object(child_sim.client, 'get', return_value=mock_response) as mock_get, \
+                 patch.object(child_sim, '_apply_geofence') as mock_apply_geofence:
+                await child_sim._update_data()
+                await child_sim._update_data()
+                assert [c.args[0] for c in mock_get.call_args_list] == [
+                    f"{child_sim.api_url}/status"
+                ] * 2
+                mock_apply_geofence.assert_not_called()
+                
+                # Newly active: fetched after status, then alongside it
+                mock_get.reset_mock()
+                mock_response.content = orjson.dumps({
+                    "emergency_state": "normal",
+                    "geofence_active": True
+                })
+                await child_sim._update_data()
+                await child_sim._update_data()
+                assert [c.args[0] for c in mock_get.call_args_list] == [
+                    f"{child_sim.api_url}/status", f"{child_sim.api_url}/geofence"
+                ] * 2
+                assert mock_apply_geofence.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_update_data_marks_dirty_only_on_change(self):
+        """Test an unchanged status payload does not request a redraw."""
+        with patch('child_simulator.GPSSimulator'), \
+             patch('child_simulator.signal.signal'):
+            child_sim = ChildSimulator()
+            
+            mock_response = Mock()
+            mock_response.status_code = 200
+            type(mock_response).content = PropertyMock(side_effect=lambda: orjson.dumps({
+                "current_location": None,
+                "emergency_state": "normal",
+                "geofence_active": False,
+                "last_update": datetime.now().isoformat()
+            }))
+            
+            clock = Mock(return_value=1000.2)
+            with patch.object(child_sim.client, 'get', return_value=mock_response), \
+                 patch('child_simulator.time.time', clock):
+                await child_sim._update_data()
+                assert child_sim._dirty is True
+                
+                # Only last_update differs between these two polls
+                child_sim._dirty = False
+                child_sim.emergency_state = EmergencyState.PANIC
+                clock.return_value = 1000.7
+                await child_sim._update_data()
+                assert child_sim._dirty is False
+                assert child_sim.emergency_state == EmergencyState.PANIC
+                
+                # A new second alone is picked up by the next redraw
+                clock.return_value = 1001.1
+                await child_sim._update_data()
+                assert child_sim._dirty is False
+                assert child_sim.last_update_time == 1001.1
+    
+    @pytest.mark.asyncio
+    async def test_update_data_reuses_polled_location(self):
+        """Test successive polls update one Location in place."""
+        with patch('child_simulator.GPSSimulator'), \
+             patch('child_simulator.signal.signal'):
+            child_sim = ChildSimulator()
+            
+            def status(latitude):
+                response = Mock()
+                response.status_code = 200
+                response.content = orjson.dumps({
+                    "current_location": {"latitude": latitude, "longitude": -74.0060},
+                    "emergency_state": "normal",
+                    "geofence_active": False
+                })
+                return response
+            
+            with patch.object(child_sim.client, 'get', return_value=status(40.7128)):
+                await child_sim._update_data()
+            first = child_sim.current_location
+            
+            with patch.object(child_sim.client, 'get', return_value=status(40.7200)):
+                await child_sim._update_data()
+            
+            assert child_sim.current_location is first
+            assert first.latitude == 40.7200
+    
+    @pytest.mark.asyncio
+    async def test_update_data_skips_overlapping_tick(self):
+        """Test a tick is skipped while the previous poll is in flight."""
+        with patch('child_simulator.GPSSimulator'), \
+             patch('child_simulator.signal.signal'):
+            child_sim = ChildSimulator()
+            child_sim._update_in_flight = True
+            
+            with patch.object(child_sim.client, 'get') as mock_get:
+                await child_sim._update_data()
+                
+                mock_get.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_update_geofence_success(self):
@@ -115,13 +238,13 @@ class TestChildSimulator:
             # Mock HTTP response
             mock_response = Mock()
             mock_response.status_code = 200
-            mock_response.json.return_value = {
+            mock_response.content = orjson.dumps({
                 "center": {
                     "latitude": 40.7128,
                     "longitude": -74.0060
                 },
                 "radius_meters": 1000.0
-            }
+            })
             
             with patch.object(child_sim.client, 'get', return_value=mock_response) as mock_get:
                 await child_sim._update_geofence()
@@ -134,6 +257,32 @@ class TestChildSimulator:
                 assert child_sim.geofence.center.longitude == -74.0060
                 assert child_sim.geofence.radius_meters == 1000.0
     
+    def test_apply_geofence_reuses_unchanged_definition(self):
+        """Test an unchanged geofence response keeps the existing object."""
+        with patch('child_simulator.GPSSimulator'), \
+             patch('child_simulator.signal.signal'):
+            child_sim = ChildSimulator()
+            
+            mock_response = Mock()
+            mock_response.status_code = 200
+            mock_response.content = orjson.dumps({
+                "center": {"latitude": 40.7128, "longitude": -74.0060},
+                "radius_meters": 1000.0
+            })
+            
+            child_sim._apply_geofence(mock_response)
+            first = child_sim.geofence
+            child_sim._apply_geofence(mock_response)
+            
+            assert child_sim.geofence is first
+            
+            mock_response.content = orjson.dumps({
+                "center": {"latitude": 40.7128, "longitude": -74.0060},
+                "radius_meters": 500.0
+            })
+            child_sim._apply_geofence(mock_response)
+            assert child_sim.geofence.radius_meters == 500.0
+    
     @pytest.mark.asyncio
     async def test_update_geofence_failure(self):
         """Test geofence update failure handling."""
@@ -164,6 +313,55 @@ class TestChildSimulator:
                 mock_print.assert_called()
                 assert "Error updating data" in str(mock_print.call_args)
     
+    @pytest.mark.asyncio
+    async def test_update_data_backs_off_on_failures(self):
+        """Test consecutive failures back off and a success resets the delay."""
+        with patch('child_simulator.GPSSimulator'), \
+             patch('child_simulator.signal.signal'):
+            child_sim = ChildSimulator()
+            assert child_sim._poll_delay() == 1.0
+            
+            with patch.object(child_sim.client, 'get', side_effect=Exception("Network error")), \
+                 patch.object(child_sim.console, 'print') as mock_print:
+                for _ in range(3):
+                    await child_sim._update_data()
+                
+                # Only the first error in the cooldown window is printed
+                assert mock_print.call_count == 1
+            
+            assert child_sim._fail_count == 3
+            assert 8.0 <= child_sim._poll_delay() < 9.0
+            child_sim._fail_count = 10
+            assert 30.0 <= child_sim._poll_delay() < 31.0
+            
+            mock_response = Mock()
+            mock_response.status_code = 200
+            mock_response.content = orjson.dumps({
+                "current_location": None,
+                "emergency_state": "normal",
+                "geofence_active": False
+            })
+            with patch.object(child_sim.client, 'get', return_value=mock_response):
+                await child_sim._update_data()
+            assert child_sim._fail_count == 0
+            assert child_sim._poll_delay() == 1.0
+    
+    def test_on_resize_tracks_visibility(self):
+        """Test a zero-size terminal is treated as hidden."""
+        with patch('child_simulator.GPSSimulator'), \
+             patch('child_simulator.signal.signal'):
+            child_sim = ChildSimulator()
+            
+            with patch('child_simulator.shutil.get_terminal_size', return_value=(0, 0)):
+                child_sim._on_resize(28, None)
+            assert child_sim._visible is False
+            
+            child_sim._dirty = False
+            with patch('child_simulator.shutil.get_terminal_size', return_value=(120, 40)):
+                child_sim._on_resize(28, None)
+            assert child_sim._visible is True
+            assert child_sim._dirty is True
+    
     def test_on_location_update_no_geofence(self):
         """Test location update callback without geofence."""
         with patch('child_simulator.GPSSimulator'), \
@@ -215,10 +413,9 @@ class TestChildSimulator:
                 child_sim._on_location_update(location)
                 
                 assert child_sim.current_location == location
-                mock_print.assert_called_once()
-                # Check if the call contains expected text
-                call_args = mock_print.call_args[0][0] if mock_print.call_args else ""
-                assert "WARNING" in call_args and "safe zone" in call_args
+                # Warnings are buffered for the alerts panel, not printed
+                mock_print.assert_not_called()
+                assert list(child_sim._warn_buffer) == [(100, 2000.0)]
     
     def test_on_location_update_alert_cooldown(self):
         """Test location update alert cooldown functionality."""
@@ -239,8 +436,42 @@ class TestChildSimulator:
                 
                 child_sim._on_location_update(location)
                 
-                # Should not print alert due to cooldown
+                # Should not record alert due to cooldown
                 mock_print.assert_not_called()
+                assert len(child_sim._warn_buffer) == 0
+    
+    def test_on_location_update_skips_repeated_point(self):
+        """Test a repeated point reuses the last safety result and still alerts."""
+        with patch('child_simulator.GPSSimulator'), \
+             patch('child_simulator.signal.signal'):
+            child_sim = ChildSimulator()
+            child_sim.geofence = Geofence(Location(40.7128, -74.0060), 1000.0)
+            
+            with patch('child_simulator.check_location_safety', return_value=(False, 2000.0)) as mock_check, \
+                 patch('child_simulator.time.time', side_effect=[100, 200]):
+                child_sim._on_location_update(Location(40.8000, -74.0060))
+                child_sim._on_location_update(Location(40.800001, -74.0060))
+                
+                mock_check.assert_called_once()
+                # Outside the cooldown the repeated point alerts again
+                assert list(child_sim._warn_buffer) == [(100, 2000.0), (200, 2000.0)]
+    
+    def test_on_locations_batch_unsafe(self):
+        """Test a batch with a point outside the geofence records one warning."""
+        with patch('child_simulator.GPSSimulator'), \
+             patch('child_simulator.signal.signal'):
+            child_sim = ChildSimulator()
+            child_sim.geofence = Geofence(Location(0.0, 0.0), 1000.0)
+            locations = [Location(0.001, 0.0), Location(0.02, 0.0), Location(0.002, 0.0)]
+            
+            with patch('child_simulator.time.time', return_value=100), \
+                 patch.object(child_sim.console, 'print') as mock_print:
+                child_sim._on_locations_batch(locations)
+                
+                mock_print.assert_not_called()
+                assert len(child_sim._warn_buffer) == 1
+                assert child_sim._warn_buffer[0][1] > 1000
+                assert child_sim.current_location == locations[-1]
     
     def test_on_emergency_update_panic(self):
         """Test emergency update callback - panic state."""
@@ -529,6 +760,78 @@ class TestChildSimulator:
             assert isinstance(panel, Panel)
             # Panel is created successfully - checking specific content is complex with Rich
             assert panel.border_style == "green"
+    
+    def test_create_alerts(self):
+        """Test alerts panel creation from buffered warnings."""
+        with patch('child_simulator.GPSSimulator'), \
+             patch('child_simulator.signal.signal'):
+            child_sim = ChildSimulator()
+            
+            assert child_sim._create_alerts().title == "Recent Alerts"
+            
+            child_sim._warn_buffer.append((100.0, 2000.0))
+            panel = child_sim._create_alerts()
+            
+            assert isinstance(panel, Panel)
+            assert panel.border_style == "yellow"
+    
+    def test_static_panels_are_reused(self):
+        """Test static panels are built once and info follows the geofence."""
+        with patch('child_simulator.GPSSimulator'), \
+             patch('child_simulator.signal.signal'):
+            child_sim = ChildSimulator()
+            
+            assert child_sim._create_footer() is child_sim._create_footer()
+            assert child_sim._create_controls() is child_sim._create_controls()
+            
+            info = child_sim._create_info()
+            assert child_sim._create_info() is info
+            
+            child_sim.geofence = Geofence(Location(40.7128, -74.0060), 1000.0)
+            assert child_sim._create_info() is not info
+    
+    def test_tables_are_reused(self):
+        """Test location and status grids are updated in place across frames."""
+        with patch('child_simulator.GPSSimulator'), \
+             patch('child_simulator.signal.signal'):
+            child_sim = ChildSimulator()
+            child_sim.current_location = Location(40.7128, -74.0060, "t1")
+            
+            first = child_sim._create_location().renderable
+            child_sim.current_location = Location(40.7200, -74.0060, "t2")
+            second = child_sim._create_location().renderable
+            
+            assert second is first
+            console = Console(file=io.StringIO(), width=100)
+            console.print(child_sim._create_location())
+            output = console.file.getvalue()
+            assert "40.720000" in output
+            assert "t2" in output
+            assert "40.712800" not in output
+            assert child_sim._create_status().renderable is child_sim._create_status().renderable
+
+
+class TestCheckLocationSafety:
+    """Test cases for the memoized safety check."""
+    
+    def test_inside_and_outside(self):
+        """Test safety result and distance to the boundary."""
+        geofence = Geofence(Location(0.0, 0.0), 1000.0)
+        
+        is_safe, distance = check_location_safety(Location(0.005, 0.0), geofence)
+        assert is_safe is True
+        assert distance < 0
+        
+        is_safe, distance = check_location_safety(Location(0.015, 0.0), geofence)
+        assert is_safe is False
+        assert distance > 0
+    
+    def test_geofence_change_is_not_served_from_cache(self):
+        """Test the cache is keyed by the geofence definition."""
+        location = Location(0.005, 0.0)
+        
+        assert check_location_safety(location, Geofence(Location(0.0, 0.0), 1000.0))[0]
+        assert not check_location_safety(location, Geofence(Location(0.0, 0.0), 100.0))[0]
 
 
 class TestChildSimulatorIntegration:
@@ -549,7 +852,7 @@ class TestChildSimulatorIntegration:
             # Mock all HTTP responses
             status_response = Mock()
             status_response.status_code = 200
-            status_response.json.return_value = {
+            status_response.content = orjson.dumps({
                 "current_location": {
                     "latitude": 40.7128,
                     "longitude": -74.0060,
@@ -557,14 +860,14 @@ class TestChildSimulatorIntegration:
                 },
                 "emergency_state": "normal",
                 "geofence_active": True
-            }
+            })
             
             geofence_response = Mock()
             geofence_response.status_code = 200
-            geofence_response.json.return_value = {
+            geofence_response.content = orjson.dumps({
                 "center": {"latitude": 40.7128, "longitude": -74.0060},
                 "radius_meters": 1000.0
-            }
+            })
             
             with patch.object(child_sim.client, 'get') as mock_get:
                 mock_get.side_effect = [status_response, geofence_response]
@@ -118,6 +118,8 @@ class TestAPIConfig:
         assert config.description == "Child safety monitoring system API"
         assert config.version == "1.0.0"
         assert config.websocket_max_connections == 100
+        assert config.websocket_ping_interval == 20.0
+        assert config.websocket_ping_timeout == 20.0
         assert config.request_timeout == 30.0
     
     def test_custom_api_config(self):
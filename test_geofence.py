@@ -6,7 +6,12 @@ Purpose: Equivalence partitioning + boundary value testing for geofence calculat
 
 import pytest
 import math
-from geofence import Location, Geofence, GeofenceChecker, check_location_safety, create_home_geofence
+import numpy as np
+from unittest.mock import patch
+from geofence import (
+    Location, Geofence, GeofenceChecker, check_location_safety,
+    check_location_safety_batch, create_home_geofence, LocationBuffer, GeofenceSet
+)
 
 
 class TestLocation:
@@ -25,6 +30,26 @@ class TestLocation:
         assert loc2.longitude == 0.0
         assert loc2.timestamp == "2024-01-01 12:00:00"
     
+    def test_location_has_no_instance_dict(self):
+        """Test Location stores its fields in slots."""
+        loc = Location(40.7128, -74.0060)
+        assert not hasattr(loc, "__dict__")
+        assert not hasattr(Location.unchecked(0.0, 0.0), "__dict__")
+    
+    def test_validation_can_be_disabled(self):
+        """Test the class-level switch skips range checks."""
+        with patch.object(Location, "_VALIDATE", False):
+            loc = Location(95.0, 200.0)
+        assert loc.latitude == 95.0
+        
+        with pytest.raises(ValueError):
+            Location(95.0, 200.0)
+    
+    def test_unchecked_location_creation(self):
+        """Test building a location without re-validating coordinates."""
+        loc = Location.unchecked(40.7128, -74.0060, "2024-01-01 12:00:00")
+        assert loc == Location(40.7128, -74.0060, "2024-01-01 12:00:00")
+    
     def test_invalid_latitude_boundary_values(self):
         """Test boundary value analysis for latitude."""
         # Boundary values: -90, -89.9, 89.9, 90
@@ -99,6 +124,33 @@ class TestGeofence:
         assert geofence.center == center
         assert geofence.radius_meters == 1000.0
     
+    def test_distance_from_center(self):
+        """Test cached-center distance matches the generic haversine."""
+        center = Location(40.7128, -74.0060)
+        geofence = Geofence(center, 1000.0)
+        london = Location(51.5074, -0.1278)
+        
+        expected = GeofenceChecker.haversine_distance(london, center)
+        assert abs(geofence.distance_from_center(london.latitude, london.longitude) - expected) < 1e-6
+        assert geofence.distance_from_center(center.latitude, center.longitude) == 0.0
+    
+    def test_contains(self):
+        """Test specialized containment check agrees with the radius."""
+        geofence = Geofence(Location(0.0, 0.0), 1000.0)
+        
+        assert geofence.contains(0.0, 0.0)
+        assert geofence.contains(0.008, 0.0)
+        assert not geofence.contains(0.01, 0.0)
+        # Corner of the circumscribed box is outside despite small offsets
+        assert not geofence.contains(0.0085, 0.0085)
+    
+    def test_contains_high_latitude(self):
+        """Test containment scales longitude offsets away from the equator."""
+        geofence = Geofence(Location(80.0, 0.0), 1000.0)
+        
+        assert geofence.contains(80.0, 0.04)
+        assert not geofence.contains(80.0, 0.06)
+    
     def test_invalid_radius_boundary_values(self):
         """Test boundary value analysis for radius."""
         center = Location(0.0, 0.0)
@@ -194,6 +246,116 @@ class TestGeofenceChecker:
         outside_loc = Location(0.0135, 0.0)  # Approximately 1500m north
         assert GeofenceChecker.is_inside_geofence(outside_loc, geofence) is False
     
+    def test_haversine_to_geofence(self):
+        """Test the cached-center distance matches the two-location haversine."""
+        geofence = Geofence(self.nyc, 1000.0)
+        
+        distance = GeofenceChecker.haversine_to_geofence(self.london, geofence)
+        assert distance == pytest.approx(GeofenceChecker.haversine_distance(self.london, self.nyc))
+        
+        with pytest.raises(ValueError, match="location must be a Location object"):
+            GeofenceChecker.haversine_to_geofence("invalid", geofence)
+        with pytest.raises(ValueError, match="geofence must be a Geofence object"):
+            GeofenceChecker.haversine_to_geofence(self.nyc, "invalid")
+    
+    def test_equirectangular_distance(self):
+        """Test the flat-earth distance agrees with haversine over short ranges."""
+        nearby = Location(40.7200, -74.0000)
+        
+        flat = GeofenceChecker.equirectangular_distance(self.nyc, nearby)
+        exact = GeofenceChecker.haversine_distance(self.nyc, nearby)
+        assert abs(flat - exact) / exact < 0.001
+        
+        # Across the antimeridian the short way round is used
+        east = Location(0.0, 179.9995)
+        west = Location(0.0, -179.9995)
+        assert GeofenceChecker.equirectangular_distance(east, west) < 200
+        
+        with pytest.raises(ValueError, match="Both arguments must be Location objects"):
+            GeofenceChecker.equirectangular_distance("invalid", self.nyc)
+    
+    def test_is_inside_geofence_matches_haversine(self):
+        """Test the small-radius fast path agrees with the haversine decision."""
+        geofence = Geofence(self.nyc, 1000.0)
+        for dlat in (-0.0095, -0.0089, 0.0, 0.0089, 0.0095):
+            for dlon in (-0.0125, -0.0117, 0.0, 0.0117, 0.0125):
+                location = Location(self.nyc.latitude + dlat, self.nyc.longitude + dlon)
+                expected = GeofenceChecker.haversine_distance(location, self.nyc) <= 1000.0
+                assert GeofenceChecker.is_inside_geofence(location, geofence) is expected
+    
+    def test_is_inside_geofence_agrees_at_boundary(self):
+        """Test the fast path and the haversine APIs agree outside a 0.01% boundary band."""
+        radius = 5000.0
+        for center in (self.nyc, Location(60.0, 10.0), Location(-33.8688, 151.2093), Location(75.0, 0.0)):
+            geofence = Geofence(center, radius)
+            for bearing in map(math.radians, range(0, 360, 15)):
+                # Roughly radius away along the bearing, then scaled onto the haversine distance
+                dlat = radius / 111320.0 * math.cos(bearing)
+                dlon = radius / 111320.0 * math.sin(bearing) / math.cos(math.radians(center.latitude))
+                distance = GeofenceChecker.haversine_distance(
+                    Location(center.latitude + dlat, center.longitude + dlon), center
+                )
+                for scale in (0.9999, 1.0001):
+                    k = radius * scale / distance
+                    location = Location(center.latitude + dlat * k, center.longitude + dlon * k)
+                    
+                    fast = GeofenceChecker.is_inside_geofence(location, geofence)
+                    assert fast is (scale < 1)
+                    assert fast is check_location_safety(location, geofence)[0]
+                    assert fast is geofence.contains(location.latitude, location.longitude)
+    
+    def test_is_inside_geofence_large_radius_matches_haversine(self):
+        """Test the haversine-term comparison agrees with the full distance."""
+        geofence = Geofence(self.nyc, 50000.0)
+        for dlat in (-0.46, -0.44, 0.0, 0.44, 0.46):
+            location = Location(self.nyc.latitude + dlat, self.nyc.longitude)
+            expected = GeofenceChecker.haversine_distance(location, self.nyc) <= 50000.0
+            assert GeofenceChecker.is_inside_geofence(location, geofence) is expected
+        
+        # A radius beyond half the globe contains every point
+        whole_globe = Geofence(self.nyc, 25000000.0)
+        antipode = Location(-self.nyc.latitude, self.nyc.longitude + 180.0)
+        assert GeofenceChecker.is_inside_geofence(antipode, whole_globe) is True
+    
+    def test_distance_array(self):
+        """Test element-wise distances broadcast and match the scalar haversine."""
+        points = [self.london, self.tokyo, self.sydney]
+        lats = np.array([p.latitude for p in points])
+        lons = np.array([p.longitude for p in points])
+        
+        distances = GeofenceChecker.distance_array(lats, lons, self.nyc.latitude, self.nyc.longitude)
+        expected = [GeofenceChecker.haversine_distance(p, self.nyc) for p in points]
+        assert np.allclose(distances, expected)
+        
+        # Pairwise over equal-length arrays
+        pairwise = GeofenceChecker.distance_array(lats, lons, lats[::-1], lons[::-1])
+        assert pairwise[1] == pytest.approx(0.0)
+        assert pairwise[0] == pytest.approx(GeofenceChecker.haversine_distance(self.london, self.sydney))
+    
+    def test_haversine_distance_batch(self):
+        """Test batched distances match the scalar haversine."""
+        points = [self.nyc, self.london, self.tokyo, self.sydney]
+        distances = GeofenceChecker.haversine_distance_batch(
+            np.array([p.latitude for p in points]),
+            np.array([p.longitude for p in points]),
+            self.nyc.latitude, self.nyc.longitude
+        )
+        
+        expected = [GeofenceChecker.haversine_distance(p, self.nyc) for p in points]
+        assert np.allclose(distances, expected)
+    
+    def test_is_inside_geofence_batch(self):
+        """Test batched inside check returns a boolean mask."""
+        geofence = Geofence(Location(0.0, 0.0), 1000.0)
+        mask = GeofenceChecker.is_inside_geofence_batch(
+            np.array([0.0, 0.0045, 0.0135]), np.zeros(3), geofence
+        )
+        
+        assert mask.tolist() == [True, True, False]
+        
+        with pytest.raises(ValueError, match="geofence must be a Geofence object"):
+            GeofenceChecker.is_inside_geofence_batch(np.zeros(1), np.zeros(1), "invalid")
+    
     def test_is_inside_geofence_invalid_inputs(self):
         """Test geofence check with invalid inputs."""
         geofence = Geofence(self.nyc, 1000.0)
@@ -237,6 +399,95 @@ class TestGeofenceChecker:
         assert geofence.radius_meters == 1000.0  # Default radius
 
 
+class TestGeofenceSet:
+    """Test cases for GeofenceSet class."""
+    
+    def test_contains_matches_each_fence(self):
+        """Test the mask agrees with checking each fence on its own."""
+        fences = [
+            Geofence(Location(40.7128, -74.0060), 1000.0),
+            Geofence(Location(40.7200, -74.0000), 500.0),
+            Geofence(Location(51.5074, -0.1278), 2000000.0)
+        ]
+        fence_set = GeofenceSet(fences)
+        
+        for point in (Location(40.7128, -74.0060), Location(40.7195, -74.0005), Location(48.8566, 2.3522)):
+            expected = [GeofenceChecker.is_inside_geofence(point, f) for f in fences]
+            assert fence_set.contains(point.latitude, point.longitude).tolist() == expected
+    
+    def test_empty_and_invalid(self):
+        """Test an empty set and non-Geofence members."""
+        assert len(GeofenceSet([])) == 0
+        assert GeofenceSet([]).contains(0.0, 0.0).tolist() == []
+        
+        with pytest.raises(ValueError, match="fences must contain Geofence objects"):
+            GeofenceSet(["invalid"])
+
+
+class TestLocationBuffer:
+    """Test cases for LocationBuffer class."""
+    
+    def test_append_and_arrays(self):
+        """Test points are returned oldest first as float arrays."""
+        buf = LocationBuffer(capacity=3)
+        buf.append(1.0, 2.0, "2024-01-01T12:00:00")
+        buf.append_location(Location(3.0, 4.0))
+        
+        lats, lons, stamps = buf.as_arrays()
+        assert len(buf) == 2
+        assert lats.tolist() == [1.0, 3.0]
+        assert lons.tolist() == [2.0, 4.0]
+        assert stamps.tolist() == ["2024-01-01T12:00:00", None]
+    
+    def test_keeps_most_recent_points(self):
+        """Test the oldest points are dropped past capacity."""
+        buf = LocationBuffer(capacity=3)
+        for i in range(10):
+            buf.append(float(i), 0.0)
+        
+        lats, _, _ = buf.as_arrays()
+        assert lats.tolist() == [7.0, 8.0, 9.0]
+    
+    def test_to_locations(self):
+        """Test Location objects are rebuilt for the last points."""
+        buf = LocationBuffer(capacity=5)
+        buf.append(1.0, 2.0, "2024-01-01T12:00:00.500000")
+        buf.append(3.0, 4.0)
+        
+        first, second = buf.to_locations()
+        assert (first.latitude, first.longitude) == (1.0, 2.0)
+        assert first.timestamp == "2024-01-01T12:00:00.500000"
+        assert second.timestamp is None
+        assert buf.to_locations(1) == [second]
+        assert buf.to_locations(0) == []
+    
+    def test_timestamps_kept_verbatim(self):
+        """Test timestamps come back as the original strings, even unparseable ones."""
+        buf = LocationBuffer(capacity=5)
+        stamps = ["2024-01-01T12:00:00+05:00", "2024-01-01T12:00:00Z", "not a time"]
+        for stamp in stamps:
+            buf.append(0.0, 0.0, stamp)
+        
+        restored = [location.timestamp for location in buf.to_locations()]
+        assert restored == stamps
+        assert all(type(stamp) is str for stamp in restored)
+    
+    def test_feeds_batch_safety(self):
+        """Test buffer arrays can be checked against a geofence directly."""
+        buf = LocationBuffer(capacity=5)
+        buf.append(0.0, 0.0)
+        buf.append(0.0135, 0.0)
+        
+        lats, lons, _ = buf.as_arrays()
+        is_safe, _ = check_location_safety_batch(lats, lons, Geofence(Location(0.0, 0.0), 1000.0))
+        assert is_safe.tolist() == [True, False]
+    
+    def test_invalid_capacity(self):
+        """Test a non-positive capacity is rejected."""
+        with pytest.raises(ValueError, match="Capacity must be positive"):
+            LocationBuffer(capacity=0)
+
+
 class TestConvenienceFunctions:
     """Test cases for convenience functions."""
     
@@ -257,6 +508,26 @@ class TestConvenienceFunctions:
         assert is_safe is False
         assert distance > 0
     
+    def test_check_location_safety_batch(self):
+        """Test batched safety check matches the scalar version."""
+        center = Location(0.0, 0.0)
+        geofence = Geofence(center, 1000.0)
+        
+        lats = np.array([0.0, 0.005, 0.015, -0.008])
+        lons = np.array([0.0, 0.0, 0.0, 0.0])
+        is_safe, distance = check_location_safety_batch(lats, lons, geofence)
+        
+        assert is_safe.tolist() == [True, True, False, True]
+        for i in range(len(lats)):
+            expected_safe, expected_distance = check_location_safety(Location(lats[i], lons[i]), geofence)
+            assert is_safe[i] == expected_safe
+            assert abs(distance[i] - expected_distance) < 1e-6
+    
+    def test_check_location_safety_batch_invalid_geofence(self):
+        """Test batched safety check with invalid geofence."""
+        with pytest.raises(ValueError, match="geofence must be a Geofence object"):
+            check_location_safety_batch(np.array([0.0]), np.array([0.0]), "invalid")
+    
     def test_create_home_geofence(self):
         """Test create_home_geofence function."""
         geofence = create_home_geofence(40.7128, -74.0060)
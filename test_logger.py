@@ -4,13 +4,21 @@ Author: Bhushan Chandrakant
 Purpose: Test audit logging functionality
 """
 
+import gc
 import os
+import glob
+import gzip
 import json
+import queue
+import sys
+import threading
 import time
+import weakref
 from datetime import datetime
 from unittest import TestCase
+from unittest.mock import patch
 import pytest
-from logger import AuditLogger, create_logger
+from logger import AuditLogger, create_logger, _close_open_loggers, _open_loggers, _write_all
 
 
 class TestAuditLogger(TestCase):
@@ -23,8 +31,11 @@ class TestAuditLogger(TestCase):
     
     def tearDown(self):
         """Clean up test environment."""
+        self.logger.close()
         if os.path.exists(self.test_file):
             os.remove(self.test_file)
+        for archive in glob.glob(self.test_file + ".*.gz"):
+            os.remove(archive)
     
     def test_log_event(self):
         """Test logging an event."""
@@ -37,6 +48,27 @@ class TestAuditLogger(TestCase):
         assert entries[0].event_type == event_type
         assert entries[0].details == details
     
+    def test_entry_timestamp(self):
+        """Test entries carry integer nanosecond timestamps."""
+        before = time.time_ns()
+        self.logger.log_event("test", {})
+        entry = self.logger.get_recent_entries(1)[0]
+        
+        assert isinstance(entry.timestamp, int)
+        assert before <= entry.timestamp <= time.time_ns()
+        assert entry.iso_timestamp.endswith("+00:00")
+        assert abs(datetime.fromisoformat(entry.iso_timestamp).timestamp() - entry.timestamp / 1e9) < 1e-3
+    
+    def test_event_types_are_interned(self):
+        """Test entries share one str object per event type."""
+        self.logger.log_event("".join(["pan", "ic"]), {})
+        self.logger.log_event("".join(["cus", "tom"]), {})
+        self.logger.log_event("".join(["cus", "tom"]), {})
+        
+        panic, first, second = self.logger.get_recent_entries(3)
+        assert panic.event_type is sys.intern("panic")
+        assert first.event_type is second.event_type
+    
     def test_get_recent_entries(self):
         """Test getting recent entries."""
         for i in range(5):
@@ -46,6 +78,127 @@ class TestAuditLogger(TestCase):
         assert len(entries) == 3
         assert entries[-1].details["index"] == 4
     
+    def test_entry_cache_is_bounded(self):
+        """Test only the most recent max_cache_size entries stay in memory."""
+        logger = AuditLogger(self.test_file, max_cache_size=3)
+        for i in range(5):
+            logger.log_event("test", {"index": i})
+        
+        assert [e.details["index"] for e in logger.get_recent_entries(10)] == [2, 3, 4]
+        assert logger.get_statistics()["total_entries"] == 5
+        logger.close()
+    
+    def test_entries_by_type(self):
+        """Test typed reads return only the most recent entries of that type."""
+        self.logger.log_event("alert", {"type": "panic"})
+        for i in range(3):
+            self.logger.log_event("location_update", {"index": i})
+        self.logger.log_event("alert", {"type": "geofence_exit"})
+        
+        assert [e.details["index"] for e in self.logger.get_entries_by_type("location_update", 2)] == [1, 2]
+        assert self.logger.get_recent_alerts() == [{"type": "panic"}, {"type": "geofence_exit"}]
+        assert self.logger.get_recent_locations(1) == [{"index": 2}]
+        assert self.logger.get_entries_by_type("missing") == []
+        
+        self.logger.clear()
+        assert self.logger.get_recent_alerts() == []
+    
+    def test_get_entries_by_time_range(self):
+        """Test a time range is read back from the file via the offset index."""
+        stamps = iter([100, 200, 300, 400])
+        with patch("logger.time.time_ns", side_effect=lambda: next(stamps)):
+            for i in range(4):
+                self.logger.log_event("test", {"index": i})
+        
+        entries = self.logger.get_entries_by_time_range(150, 300)
+        assert [e.details["index"] for e in entries] == [1, 2]
+        assert [e.timestamp for e in entries] == [200, 300]
+        assert self.logger.get_entries_by_time_range(500, 600) == []
+        
+        # A new logger on the same file indexes the existing lines
+        self.logger.close()
+        reopened = AuditLogger(self.test_file)
+        assert not reopened._index_ready
+        assert [e.details["index"] for e in reopened.get_entries_by_time_range(0, 250)] == [0, 1]
+        reopened.close()
+    
+    def test_time_range_past_evicted_index(self):
+        """Test the index stays capped and older ranges fall back to scanning the file."""
+        self.logger.INDEX_MAX_ENTRIES = 4
+        stamps = iter(range(100, 1100, 100))
+        with patch("logger.time.time_ns", side_effect=lambda: next(stamps)):
+            for i in range(10):
+                self.logger.log_event("test", {"index": i})
+        
+        entries = self.logger.get_entries_by_time_range(900, 1000)
+        assert [e.details["index"] for e in entries] == [8, 9]
+        assert len(self.logger._index_ts) <= 4
+        assert self.logger._index_floor > 100
+        
+        entries = self.logger.get_entries_by_time_range(0, 350)
+        assert [e.details["index"] for e in entries] == [0, 1, 2]
+    
+    def test_time_range_with_interleaved_producers(self):
+        """Test an entry stamped early but written late is still found by its own time."""
+        stamps = iter([100, 200, 300])
+        stamped = threading.Event()
+        release = threading.Event()
+        enqueue = self.logger._enqueue
+        
+        def delayed_enqueue(entries):
+            # Producer A is stamped first but reaches the queue last
+            if entries[0].details["producer"] == "a":
+                stamped.set()
+                release.wait(5)
+            enqueue(entries)
+        
+        with patch("logger.time.time_ns", side_effect=lambda: next(stamps)), \
+                patch.object(self.logger, "_enqueue", side_effect=delayed_enqueue):
+            producer_a = threading.Thread(
+                target=self.logger.log_event, args=("test", {"producer": "a"})
+            )
+            producer_a.start()
+            stamped.wait(5)
+            producer_b = threading.Thread(
+                target=lambda: [self.logger.log_event("test", {"producer": "b"}) for _ in range(2)]
+            )
+            producer_b.start()
+            producer_b.join()
+            release.set()
+            producer_a.join()
+        
+        assert [e.details["producer"] for e in self.logger.get_entries_by_time_range(50, 150)] == ["a"]
+        assert [e.timestamp for e in self.logger.get_entries_by_time_range(0, 1000)] == [100, 200, 300]
+    
+    def test_log_rotation(self):
+        """Test a full log file is compressed into an archive and restarted."""
+        self.logger.close()
+        self.logger = AuditLogger(self.test_file, buffer_size=1, max_file_size=200)
+        for i in range(5):
+            self.logger.log_event("test", {"index": i, "padding": "x" * 50})
+        # Waits for the background compression of rotated files
+        self.logger.close()
+        
+        archives = sorted(glob.glob(self.test_file + ".*.gz"))
+        assert archives
+        archived = b"".join(gzip.open(path).read() for path in archives)
+        with open(self.test_file, "rb") as f:
+            lines = (archived + f.read()).splitlines()
+        assert [json.loads(line)["details"]["index"] for line in lines] == list(range(5))
+        assert os.path.getsize(self.test_file) < 200
+    
+    def test_rotation_after_close_compresses_inline(self):
+        """Test a rotation triggered by a write after close() still archives the file."""
+        self.logger.close()
+        self.logger = AuditLogger(self.test_file, buffer_size=1, max_file_size=50)
+        self.logger.close()
+        self.logger.log_event("test", {"padding": "x" * 50})
+        
+        archives = glob.glob(self.test_file + ".*.gz")
+        assert len(archives) == 1
+        assert not glob.glob(self.test_file + ".*[0-9]")
+        assert json.loads(gzip.open(archives[0]).read())["details"]["padding"] == "x" * 50
+    
     def test_get_statistics(self):
         """Test getting statistics."""
         self.logger.log_event("location_update", {"lat": 0, "lon": 0})
@@ -60,6 +213,17 @@ class TestAuditLogger(TestCase):
         assert stats["geofence_violations"] == 1
         assert stats["errors"] == 1
     
+    def test_get_event_counts(self):
+        """Test counts cover every event type, beyond the cache size."""
+        logger = AuditLogger(self.test_file, max_cache_size=2)
+        for _ in range(3):
+            logger.log_event("custom", {})
+        logger.log_event("panic", {})
+        assert logger.get_event_counts() == {"custom": 3, "panic": 1}
+        logger.clear()
+        assert logger.get_event_counts() == {}
+        logger.close()
+    
     def test_clear(self):
         """Test clearing log."""
         self.logger.log_event("test", {"data": "test"})
@@ -75,6 +239,7 @@ class TestAuditLogger(TestCase):
         """Test log file persistence."""
         event_data = {"test": "data"}
         self.logger.log_event("test", event_data)
+        self.logger.force_flush()
         
         # Read file directly
         with open(self.test_file, "r") as f:
@@ -83,6 +248,127 @@ class TestAuditLogger(TestCase):
             assert entry["event_type"] == "test"
             assert entry["details"] == event_data
     
+    def test_to_json_bytes(self):
+        """Test entries serialize to compact JSON bytes."""
+        self.logger.log_event("test", {"nested": {"a": [1, 2]}})
+        entry = self.logger.get_recent_entries(1)[0]
+        
+        data = entry.to_json()
+        assert isinstance(data, bytes)
+        assert json.loads(data) == entry.to_dict()
+        
+        # Known event types take the template path
+        self.logger.log_event("panic", {"reason": 'quote " and \\ backslash'})
+        entry = self.logger.get_recent_entries(1)[0]
+        assert json.loads(entry.to_json()) == entry.to_dict()
+    
+    def test_buffered_writes_flush_at_buffer_size(self):
+        """Test records reach the file once buffer_size of them are written."""
+        logger = AuditLogger(self.test_file, buffer_size=2)
+        logger.log_event("test", {"index": 0})
+        logger._q.join()
+        assert os.path.getsize(self.test_file) == 0
+        
+        logger.log_event("test", {"index": 1})
+        logger._q.join()
+        with open(self.test_file, "r") as f:
+            assert [json.loads(line)["details"]["index"] for line in f] == [0, 1]
+        logger.close()
+    
+    def test_unserializable_entry_does_not_stop_writer(self):
+        """Test an entry that cannot be encoded is skipped and later ones are written."""
+        self.logger.log_event("test", {"bad": object()})
+        self.logger.log_event("test", {"index": 1})
+        self.logger.force_flush()
+        
+        with open(self.test_file, "r") as f:
+            assert [json.loads(line)["details"] for line in f] == [{"index": 1}]
+    
+    def test_full_queue_drops_file_write(self):
+        """Test records are counted as dropped when the writer queue is full."""
+        logger = AuditLogger(self.test_file)
+        logger.close()
+        logger._closed = False
+        logger._q = queue.Queue(maxsize=1)
+        logger._q.put_nowait(())
+        
+        logger.log_event("test", {"data": "test"})
+        
+        assert len(logger.get_recent_entries()) == 1
+        assert logger.get_statistics()["dropped_writes"] == 1
+    
+    def test_close_runs_at_exit(self):
+        """Test open loggers are closed at exit and dropped from tracking once closed."""
+        logger = AuditLogger(self.test_file)
+        assert logger in _open_loggers
+        
+        logger.log_event("test", {"data": "test"})
+        _close_open_loggers()
+        assert logger not in _open_loggers
+        
+        with open(self.test_file, "r") as f:
+            assert len(f.readlines()) == 1
+    
+    def test_unclosed_logger_can_be_collected(self):
+        """Test a dropped logger is freed and its writer thread exits."""
+        logger = AuditLogger(self.test_file)
+        writer = logger._writer
+        ref = weakref.ref(logger)
+        del logger
+        gc.collect()
+        
+        assert ref() is None
+        writer.join(AuditLogger.FLUSH_INTERVAL_SECONDS * 3)
+        assert not writer.is_alive()
+    
+    def test_log_after_close_writes_through(self):
+        """Test events logged after close reach the file at once and leave no fd open."""
+        self.logger.close()
+        self.logger.log_event("test", {"data": "late"})
+        assert self.logger._fd is None
+        
+        with open(self.test_file, "r") as f:
+            assert [json.loads(line)["details"] for line in f] == [{"data": "late"}]
+    
+    def test_log_concurrently_with_close(self):
+        """Test no event is lost or left unwritten when close() races producers."""
+        start = threading.Barrier(5)
+        
+        def produce(n):
+            start.wait()
+            for i in range(500):
+                self.logger.log_event("test", {"producer": n, "index": i})
+        
+        producers = [threading.Thread(target=produce, args=(n,)) for n in range(4)]
+        for t in producers:
+            t.start()
+        start.wait()
+        time.sleep(0.001)
+        self.logger.close()
+        for t in producers:
+            t.join()
+        
+        assert self.logger._fd is None
+        assert not self.logger._writer.is_alive()
+        with open(self.test_file, "r") as f:
+            written = [json.loads(line)["details"] for line in f]
+        assert len(written) == 4 * 500
+        for n in range(4):
+            assert sorted(d["index"] for d in written if d["producer"] == n) == list(range(500))
+    
+    def test_write_all_chunks_buffers(self):
+        """Test buffers beyond IOV_MAX are written in order across several calls."""
+        lines = [f"line {i}\n".encode() for i in range(5)]
+        fd = os.open(self.test_file, os.O_WRONLY | os.O_TRUNC)
+        try:
+            with patch("logger._IOV_MAX", 2):
+                _write_all(fd, lines)
+        finally:
+            os.close(fd)
+        
+        with open(self.test_file, "rb") as f:
+            assert f.read() == b"".join(lines)
+    
     def test_concurrent_logging(self):
         """Test concurrent logging."""
         import threading
@@ -12,7 +12,7 @@ import httpx
 from rich.console import Console
 from rich.panel import Panel
 
-from parent_console import ParentConsole
+from parent_console import ParentConsole, _ring_offsets
 from geofence import Location, Geofence
 from simulator import EmergencyState
 
@@ -218,20 +218,24 @@ class TestParentConsole:
             console = ParentConsole()
             
             map_size = 10
-            map_chars = [[" " for _ in range(map_size)] for _ in range(map_size)]
+            map_buf = bytearray(b"\n".join([b" " * map_size] * map_size))
             center_x, center_y = 5, 5
             radius_pixels = 3
             
-            console._draw_geofence_boundary(map_chars, center_x, center_y, radius_pixels, map_size)
+            console._draw_geofence_boundary(map_buf, center_x, center_y, radius_pixels, map_size)
             
-            # Check that some boundary characters were drawn
-            boundary_chars = 0
-            for row in map_chars:
-                for char in row:
-                    if char == "·":
-                        boundary_chars += 1
-            
-            assert boundary_chars > 0
+            # Check that some boundary characters were drawn and rows stay intact
+            assert map_buf.count(b".") > 0
+            assert [len(row) for row in map_buf.split(b"\n")] == [map_size] * map_size
+    
+    def test_ring_offsets_match_distance_check(self):
+        """Test the NumPy ring mask marks the same cells as the per-cell distance check."""
+        map_size, center_x, center_y, radius_pixels = 20, 10, 10, 8
+        expected = tuple(
+            y * (map_size + 1) + x for y in range(map_size) for x in range(map_size)
+            if abs(((x - center_x) ** 2 + (y - center_y) ** 2) ** 0.5 - radius_pixels) < 1
+        )
+        assert _ring_offsets(center_x, center_y, radius_pixels, map_size) == expected
     
     def test_create_map_no_location(self):
         """Test map creation when no location data is available."""
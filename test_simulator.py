@@ -232,6 +232,20 @@ class TestGPSSimulator:
         assert location.longitude == new_lon
         assert location.timestamp == timestamp
     
+    def test_set_locations_batch(self):
+        """Test catching up on buffered locations."""
+        batch_callback = Mock()
+        callback = Mock()
+        self.simulator.add_location_batch_callback(batch_callback)
+        self.simulator.add_location_callback(callback)
+        
+        locations = [Location(40.7128 + i * 0.001, -74.0060) for i in range(3)]
+        self.simulator.set_locations(locations)
+        
+        batch_callback.assert_called_once_with(locations)
+        callback.assert_called_once_with(locations[-1])
+        assert self.simulator.get_current_location() == locations[-1]
+    
     def test_start_simulator(self):
         """Test starting the simulator."""
         assert not self.simulator._running
@@ -358,6 +372,23 @@ class TestLocationGenerator:
         # Clean up
         self.generator.simulator.stop()
     
+    def test_location_arrays(self):
+        """Test recent locations are available as coordinate arrays."""
+        self.generator._on_location_update(Location(40.7128, -74.0060))
+        self.generator._on_location_update(Location(40.7130, -74.0050))
+        
+        lats, lons = self.generator.get_location_arrays()
+        assert lats.tolist() == [40.7128, 40.7130]
+        assert lons.tolist() == [-74.0060, -74.0050]
+        assert [loc.latitude for loc in self.generator.generate_locations(count=1)] == [40.7130]
+    
+    def test_malformed_timestamp_keeps_point(self):
+        """Test a location with an unparseable timestamp is still recorded."""
+        self.generator._on_location_update(Location(40.7128, -74.0060, "not a time"))
+        
+        locations = self.generator.generate_locations(count=1)
+        assert [loc.timestamp for loc in locations] == ["not a time"]
+    
     def test_get_simulator(self):
         """Test getting simulator instance."""
         simulator = self.generator.get_simulator()